@@ -4,53 +4,392 @@ Main application file for the virtual therapist backend.
 Handles video processing, emotion recognition, and AI responses.
 """
 
-import cv2
-import numpy as np
 import base64
-import io
+import multiprocessing
 import os
-from flask import Flask, request, jsonify, render_template
-from flask_cors import CORS
-from flask_socketio import SocketIO, emit
-import requests
-import json
-from deepface import DeepFace
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import speech_recognition as sr
-import pyttsx3
-from image_preprocessing import ImagePreprocessor
-from emotion_detector import EmotionDetector
-from gemini_client import GeminiClient
-from speech_processor import SpeechProcessor
-from websocket_handler import WebSocketHandler
-import threading
 import time
+from functools import wraps
+from import_timing import timed_import, get_import_timings, report_import_timings
+
+# Heavy frameworks (TensorFlow via DeepFace, torch, transformers, speech
+# libraries) are imported by the modules that use them, when their models load
+with timed_import('numpy/opencv'):
+    import numpy as np
+    import cv2
+with timed_import('flask'):
+    from flask import Flask, request, jsonify, render_template
+    from flask_cors import CORS
+    from flask_socketio import SocketIO
+with timed_import('backend modules'):
+    from image_preprocessing import ImagePreprocessor, DenoiseMethod
+    from emotion_detector import EmotionDetector, EmotionAnalysis
+    from gemini_client import GeminiClient
+    from websocket_handler import WebSocketHandler
+    from micro_batcher import MicroBatcher
+    from emotion_smoother import EmotionSmootherPool
+    from conversation_memory import ConversationMemory
+    from session_store import create_session_store_from_env, append_message, DEFAULT_SESSION
+    from model_loader import ModelLoader
+    from model_server import ModelClient, get_authkey_from_env
+    from inference_executor import create_inference_executor_from_env
 
 app = Flask(__name__)
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Initialize components
-image_preprocessor = ImagePreprocessor()
-emotion_detector = EmotionDetector()
-gemini_client = GeminiClient()
-speech_processor = SpeechProcessor()
-websocket_handler = WebSocketHandler(socketio)
-
-# Global state for conversation
-conversation_history = []
-current_emotions = {
-    'face_emotion': 'neutral',
-    'text_emotion': 'neutral'
+# 'frame' preprocesses the whole frame before detection,
+# 'face' detects on the raw frame and preprocesses only the face crop
+PREPROCESS_SCOPE = os.getenv('PREPROCESS_SCOPE', 'frame')
+
+# With MODEL_SERVER_ADDRESS set, models live in one shared model server process
+# per node (python model_server.py) instead of in every web worker
+MODEL_SERVER_ADDRESS = os.getenv('MODEL_SERVER_ADDRESS')
+
+# Models load in parallel background threads ('background'), on first use ('lazy')
+# or before the server starts ('eager'), so workers accept requests right away
+MODEL_LOADING = os.getenv('MODEL_LOADING', 'background')
+
+# Seconds a request waits for the models it needs before getting a 503
+MODEL_WAIT_TIMEOUT = float(os.getenv('MODEL_WAIT_TIMEOUT', '60' if MODEL_LOADING == 'lazy' else '0'))
+FACE_MODELS = ('face_detector', 'face_emotion_model')
+TEXT_MODELS = ('text_model', 'gemini_client')
+
+CONVERSATION_LOG_SIZE = int(os.getenv('SESSION_LOG_SIZE', '100'))
+
+# Recent turns and rolling summary fed back into the prompt
+HISTORY_OPTIONS = {
+    'max_turns': int(os.getenv('HISTORY_MAX_TURNS', '6')),
+    'token_budget': int(os.getenv('HISTORY_TOKEN_BUDGET', '600')),
+    'summary_token_budget': int(os.getenv('HISTORY_SUMMARY_TOKENS', '150'))
 }
 
+# Components behind the routes, built by create_app()
+image_preprocessor = None
+emotion_detector = None
+websocket_handler = None
+model_loader = None
+face_detection_batcher = None
+face_classification_batcher = None
+frame_batcher = None
+text_batcher = None
+emotion_smoothers = None
+session_store = None
+
+def load_speech_processor():
+    """Import and create the speech processor (pulls in speech_recognition and pyttsx3)"""
+    with timed_import('speech_processor'):
+        from speech_processor import SpeechProcessor
+    return SpeechProcessor()
+
+def create_app():
+    """
+    Build the detector, batchers and session store and start loading the models.
+    
+    Runs once, in the serving process only: inference worker processes import
+    the launch script again and must not build their own copies.
+    
+    Returns:
+        Flask: The application
+    """
+    global image_preprocessor, emotion_detector, websocket_handler, model_loader
+    global face_detection_batcher, face_classification_batcher, frame_batcher, text_batcher
+    global emotion_smoothers, session_store
+    
+    report_import_timings()
+    
+    if PREPROCESS_SCOPE == 'face':
+        face_size = int(os.getenv('FACE_PREPROCESS_SIZE', '96'))
+        image_preprocessor = ImagePreprocessor(
+            target_size=(face_size, face_size),
+            denoise_method=DenoiseMethod(os.getenv('DENOISE_METHOD', 'bilateral'))
+        )
+    else:
+        image_preprocessor = ImagePreprocessor(
+            denoise_method=DenoiseMethod(os.getenv('DENOISE_METHOD', 'bilateral'))
+        )
+    
+    if MODEL_SERVER_ADDRESS:
+        emotion_detector = ModelClient(
+            authkey=get_authkey_from_env(),
+            address=MODEL_SERVER_ADDRESS,
+            max_connections=int(os.getenv('MODEL_SERVER_CONNECTIONS', '8')),
+            timeout=float(os.getenv('MODEL_SERVER_TIMEOUT', '30'))
+        )
+    else:
+        # INFERENCE_EXECUTOR=process moves face model passes into a pool of worker processes
+        emotion_detector = EmotionDetector.from_env(
+            load_models=False,
+            inference_executor=create_inference_executor_from_env()
+        )
+    websocket_handler = WebSocketHandler(socketio)
+    websocket_handler.set_frame_handler(process_frame_bytes)
+    
+    model_loader = ModelLoader(MODEL_LOADING)
+    if MODEL_SERVER_ADDRESS:
+        # Ready once the model server reports the model as loaded
+        startup_timeout = float(os.getenv('MODEL_SERVER_STARTUP_TIMEOUT', '600'))
+        for model_name in ('face_detector', 'face_emotion_model', 'text_model'):
+            model_loader.register(
+                model_name,
+                lambda name=model_name: emotion_detector.wait_for_model(name, timeout=startup_timeout)
+            )
+    elif emotion_detector.inference_executor is not None:
+        # Face models live in the worker processes, which load them on start
+        model_loader.register('face_detector', emotion_detector.inference_executor.warm_up)
+        model_loader.register('face_emotion_model', emotion_detector.inference_executor.warm_up)
+        model_loader.register('text_model', emotion_detector.load_text_emotion_model)
+    else:
+        model_loader.register('face_detector', emotion_detector.load_face_detection_model)
+        model_loader.register('face_emotion_model', emotion_detector.load_face_emotion_model)
+        model_loader.register('text_model', emotion_detector.load_text_emotion_model)
+    model_loader.register('gemini_client', GeminiClient)
+    model_loader.register('speech_processor', load_speech_processor, required=False)
+    
+    # Frames from concurrent requests are grouped into one batched forward pass
+    batch_size = int(os.getenv('FRAME_BATCH_SIZE', '16'))
+    batch_wait_ms = float(os.getenv('FRAME_BATCH_WAIT_MS', '5'))
+    if PREPROCESS_SCOPE == 'face':
+        # Detection and classification are batched separately so face crops
+        # can be preprocessed on the request threads in between
+        face_detection_batcher = MicroBatcher(
+            lambda frames, session_ids: emotion_detector.detect_faces_batch(frames, session_ids=session_ids),
+            max_batch_size=batch_size,
+            max_wait_ms=batch_wait_ms,
+            name='face-detection-batcher'
+        )
+        face_classification_batcher = MicroBatcher(
+            emotion_detector.classify_face_emotions,
+            max_batch_size=batch_size,
+            max_wait_ms=batch_wait_ms,
+            name='face-classification-batcher'
+        )
+    else:
+        frame_batcher = MicroBatcher(
+            emotion_detector.get_face_emotion_confidences,
+            max_batch_size=batch_size,
+            max_wait_ms=batch_wait_ms,
+            name='frame-batcher'
+        )
+    
+    # Concurrent text requests are coalesced into one EmoRoBERTa forward pass
+    text_batcher = MicroBatcher(
+        emotion_detector.analyze_texts,
+        max_batch_size=int(os.getenv('TEXT_BATCH_SIZE', '16')),
+        max_wait_ms=float(os.getenv('TEXT_BATCH_WAIT_MS', '10')),
+        name='text-batcher'
+    )
+    
+    # Per-session change gate and smoothing for face emotions
+    emotion_smoothers = EmotionSmootherPool(
+        change_threshold=float(os.getenv('FRAME_CHANGE_THRESHOLD', '3.0')),
+        smoothing=float(os.getenv('EMOTION_SMOOTHING', '0.6'))
+    )
+    
+    # Per-session emotions, conversation log and conversation memory;
+    # SESSION_STORE=sqlite shares them between worker processes
+    session_store = create_session_store_from_env()
+    
+    model_loader.start()
+    return app
+
+def require_models(*names):
+    """
+    Return 503 from a route until the given models are loaded.
+    
+    Args:
+        *names (str): Model names registered with the model loader
+    """
+    def decorator(route):
+        @wraps(route)
+        def wrapper(*args, **kwargs):
+            if not model_loader.wait(names, timeout=MODEL_WAIT_TIMEOUT):
+                return jsonify({
+                    'error': 'Models are still loading',
+                    'models': {name: model_loader.status()[name] for name in names}
+                }), 503
+            return route(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def set_face_emotion(session_id, face_emotion):
+    """
+    Record the latest facial emotion of a session.
+    
+    Args:
+        session_id (str, optional): Session the frame belongs to
+        face_emotion (str): Detected facial emotion
+    """
+    session_store.set_face_emotion(session_id or DEFAULT_SESSION, face_emotion)
+
 @app.route('/')
 def index():
     """Serve the main application page"""
     return render_template('index.html')
 
+def decode_frame_bytes(frame_bytes):
+    """
+    Decode raw JPEG bytes into a BGR image.
+    
+    Args:
+        frame_bytes (bytes): Encoded image bytes
+        
+    Returns:
+        numpy.ndarray: Decoded image or None if the data is invalid
+    """
+    # Wrap the received buffer without copying it
+    frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
+    return cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+
+def decode_frame(frame_data_url):
+    """
+    Decode a base64 data URL into a BGR image.
+    
+    Args:
+        frame_data_url (str): Image encoded as data:image/jpeg;base64,...
+        
+    Returns:
+        numpy.ndarray: Decoded image or None if the data is invalid
+    """
+    frame_data = frame_data_url.split(',')[1]  # Remove data:image/jpeg;base64, prefix
+    return decode_frame_bytes(base64.b64decode(frame_data))
+
+def parse_denoise_method(value):
+    """
+    Parse the per-request denoise option of a frame entry point.
+    
+    Args:
+        value (str, optional): DenoiseMethod value, e.g. 'adaptive'
+        
+    Returns:
+        DenoiseMethod: Requested method, or None to use the configured one
+        
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if not value:
+        return None
+    try:
+        return DenoiseMethod(value)
+    except ValueError:
+        raise ValueError(f"Unknown denoise method: {value}")
+
+def analyze_frame(frame, session_id=None, denoise_method=None):
+    """
+    Run emotion recognition on a decoded frame and update the session's current emotion.
+    
+    Args:
+        frame (numpy.ndarray): Decoded BGR frame
+        session_id (str, optional): Video session the frame belongs to
+        denoise_method (DenoiseMethod, optional): Noise reduction stage for this frame
+        
+    Returns:
+        dict: Detected emotion, smoothed probabilities, confidence and timestamp
+    """
+    # Denoise stage that ran; None when the cached result was reused
+    applied_denoise = None
+    if session_id is None:
+        # Without a session there is nothing to compare against or smooth with
+        confidences, applied_denoise = run_face_inference(frame, session_id, denoise_method)
+        cached = False
+    else:
+        smoother = emotion_smoothers.get(session_id)
+        thumbnail = smoother.thumbnail(frame)
+        cached = smoother.is_unchanged(thumbnail)
+        if cached:
+            confidences = smoother.get_smoothed()
+        else:
+            frame_confidences, applied_denoise = run_face_inference(frame, session_id, denoise_method)
+            confidences = smoother.update(thumbnail, frame_confidences)
+    
+    analysis = EmotionAnalysis(confidences, 'face')
+    
+    if not cached:
+        # A cached result repeats the label already stored
+        set_face_emotion(session_id, analysis.label)
+    
+    return {
+        'face_emotion': analysis.label,
+        'confidence': analysis.confidence,
+        'top_emotions': analysis.to_dict()['top_emotions'],
+        'emotion_scores': analysis.scores,
+        'cached': cached,
+        'denoise': applied_denoise,
+        'timestamp': time.time()
+    }
+
+def submit_face_inference(frames, session_id=None, denoise_method=None):
+    """
+    Preprocess frames of one session and queue them for batched face emotion inference.
+    
+    Args:
+        frames (list): Decoded BGR frames
+        session_id (str, optional): Video session the frames belong to
+        denoise_method (DenoiseMethod, optional): Noise reduction stage for these frames
+        
+    Returns:
+        tuple: Futures resolving to emotion probabilities and the denoise stage
+            that ran (DenoiseMethod value), one of each per frame
+    """
+    futures = []
+    applied_denoise = []
+    if PREPROCESS_SCOPE == 'face':
+        # Detect on the raw frames, then preprocess only the face crops
+        detections = [face_detection_batcher.submit_async(frame, session_id) for frame in frames]
+        for frame, detection in zip(frames, detections):
+            face = emotion_detector.extract_face_roi(frame, detection.result())
+            processed_face = image_preprocessor.preprocess(face, denoise_method=denoise_method)
+            applied_denoise.append(image_preprocessor.last_denoise_method.value)
+            futures.append(face_classification_batcher.submit_async(processed_face))
+        return futures, applied_denoise
+    
+    for frame in frames:
+        processed_frame = image_preprocessor.preprocess(frame, denoise_method=denoise_method)
+        applied_denoise.append(image_preprocessor.last_denoise_method.value)
+        futures.append(frame_batcher.submit_async(processed_frame, session_id))
+    return futures, applied_denoise
+
+def run_face_inference(frame, session_id=None, denoise_method=None):
+    """
+    Preprocess a frame and run batched face emotion inference on it.
+    
+    Args:
+        frame (numpy.ndarray): Decoded BGR frame
+        session_id (str, optional): Video session the frame belongs to
+        denoise_method (DenoiseMethod, optional): Noise reduction stage for this frame
+        
+    Returns:
+        tuple: Emotion probabilities and the denoise stage that ran (DenoiseMethod value)
+    """
+    futures, applied_denoise = submit_face_inference([frame], session_id, denoise_method)
+    return futures[0].result(), applied_denoise[0]
+
+def process_frame_bytes(frame_bytes, session_id=None, denoise=None):
+    """
+    Process a binary JPEG frame received over Socket.IO.
+    
+    Args:
+        frame_bytes (bytes): Encoded JPEG bytes
+        session_id (str, optional): Video session the frame belongs to
+        denoise (str, optional): Noise reduction stage for this frame (DenoiseMethod value)
+        
+    Returns:
+        dict: Emotion result or error description
+    """
+    try:
+        denoise_method = parse_denoise_method(denoise)
+    except ValueError as e:
+        return {'error': str(e)}
+    
+    if not model_loader.wait(FACE_MODELS, timeout=MODEL_WAIT_TIMEOUT):
+        return {'error': 'Models are still loading'}
+    
+    frame = decode_frame_bytes(frame_bytes)
+    if frame is None:
+        return {'error': 'Invalid image data'}
+    return analyze_frame(frame, session_id, denoise_method)
+
 @app.route('/api/process_frame', methods=['POST'])
+@require_models(*FACE_MODELS)
 def process_frame():
     """
     Process a video frame for emotion recognition
@@ -62,39 +401,131 @@ def process_frame():
         if 'frame' not in data:
             return jsonify({'error': 'No frame data provided'}), 400
         
+        try:
+            denoise_method = parse_denoise_method(data.get('denoise'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Decode base64 image
-        frame_data = data['frame'].split(',')[1]  # Remove data:image/jpeg;base64, prefix
-        frame_bytes = base64.b64decode(frame_data)
-        frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-        frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+        frame = decode_frame(data['frame'])
         
         if frame is None:
             return jsonify({'error': 'Invalid image data'}), 400
         
-        # Preprocess the frame
-        processed_frame = image_preprocessor.preprocess(frame)
+        return jsonify(analyze_frame(frame, data.get('session_id'), denoise_method))
+        
+    except Exception as e:
+        print(f"Error processing frame: {e}")
+        return jsonify({'error': 'Frame processing failed'}), 500
+
+@app.route('/api/process_frames', methods=['POST'])
+@require_models(*FACE_MODELS)
+def process_frames():
+    """
+    Process several video frames for emotion recognition in one request
+    Expected input: list of base64 encoded images, optional denoise method for all of them
+    Returns: detected emotion and denoise stage per frame, in input order
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('frames'), list):
+            return jsonify({'error': 'No frames provided'}), 400
+        
+        max_frames = int(os.getenv('MAX_FRAMES_PER_REQUEST', '64'))
+        if len(data['frames']) > max_frames:
+            return jsonify({'error': f'At most {max_frames} frames per request'}), 400
+        
+        try:
+            denoise_method = parse_denoise_method(data.get('denoise'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Frames in one request are treated as consecutive frames of one session
+        session_id = data.get('session_id')
+        
+        # Decode every frame, keeping the positions of invalid ones
+        frames = []
+        for frame_data_url in data['frames']:
+            try:
+                frames.append(decode_frame(frame_data_url))
+            except Exception:
+                frames.append(None)
         
-        # Detect emotions
-        face_emotion = emotion_detector.detect_face_emotion(processed_frame)
+        # Queue every valid frame so they share batches with other requests
+        valid_frames = [frame for frame in frames if frame is not None]
+        futures, applied_denoise = submit_face_inference(valid_frames, session_id, denoise_method)
+        submitted = iter(zip(futures, applied_denoise))
+        pending = [next(submitted) if frame is not None else None for frame in frames]
         
-        # Update global state
-        current_emotions['face_emotion'] = face_emotion
+        results = []
+        for submission in pending:
+            if submission is None:
+                results.append({'error': 'Invalid image data'})
+            else:
+                future, frame_denoise = submission
+                analysis = EmotionAnalysis(future.result(), 'face')
+                results.append({
+                    'face_emotion': analysis.label,
+                    'confidence': analysis.confidence,
+                    'denoise': frame_denoise
+                })
+        
+        # Latest valid frame becomes the current emotion
+        for result in reversed(results):
+            if 'face_emotion' in result:
+                set_face_emotion(session_id, result['face_emotion'])
+                break
         
         return jsonify({
-            'face_emotion': face_emotion,
-            'confidence': 0.85,  # Placeholder - implement confidence calculation
+            'results': results,
             'timestamp': time.time()
         })
         
     except Exception as e:
-        print(f"Error processing frame: {e}")
+        print(f"Error processing frames: {e}")
         return jsonify({'error': 'Frame processing failed'}), 500
 
+def stream_ai_response(gemini_client, session_id, message_id, face_emotion, text_emotion, user_text,
+                       history=None):
+    """
+    Stream a Gemini response to a session room as it is generated.
+    
+    Args:
+        gemini_client (GeminiClient): Gemini client
+        session_id (str): Session room receiving the chunks
+        message_id: Client-chosen ID tying the chunks to one message
+        face_emotion (str): Detected facial emotion
+        text_emotion (str): Detected text emotion
+        user_text (str): User's message
+        history (dict, optional): Conversation context of the session
+        
+    Returns:
+        str: Complete response text
+    """
+    chunks = []
+    for chunk in gemini_client.stream_response(face_emotion, text_emotion, user_text, history):
+        chunks.append(chunk)
+        websocket_handler.broadcast_ai_response(session_id, {
+            'message_id': message_id,
+            'chunk': chunk,
+            'done': False
+        })
+    
+    ai_response = ''.join(chunks)
+    websocket_handler.broadcast_ai_response(session_id, {
+        'message_id': message_id,
+        'ai_response': ai_response,
+        'done': True
+    })
+    return ai_response
+
 @app.route('/api/process_text', methods=['POST'])
+@require_models(*TEXT_MODELS)
 def process_text():
     """
     Process text input for emotion detection and AI response
-    Expected input: text message from user
+    Expected input: text message from user; with stream and session_id set the
+    response is also pushed to the session room chunk by chunk ('ai_response' events)
     Returns: AI response and detected text emotion
     """
     try:
@@ -104,30 +535,55 @@ def process_text():
         
         user_text = data['text']
         
-        # Detect text emotion
-        text_emotion = emotion_detector.detect_text_emotion(user_text)
-        current_emotions['text_emotion'] = text_emotion
+        # Detect text emotion (batched with other concurrent requests) and
+        # read the session while the model runs; the prompt needs both
+        text_future = text_batcher.submit_async(user_text)
+        gemini_client = model_loader.get('gemini_client')
+        session_id = data.get('session_id')
+        session = session_store.get(session_id or DEFAULT_SESSION)
+        history = ConversationMemory.from_dict(session.memory, **HISTORY_OPTIONS).get_context()
         
-        # Get AI response from Gemini
-        ai_response = gemini_client.get_response(
-            face_emotion=current_emotions['face_emotion'],
-            text_emotion=text_emotion,
-            user_message=user_text
-        )
+        text_analysis = text_future.result()
+        text_emotion = text_analysis.label
+        text_result = text_analysis.to_dict()
         
-        # Add to conversation history
+        if data.get('stream') and session_id:
+            ai_response = stream_ai_response(
+                gemini_client, session_id, data.get('message_id'),
+                session.face_emotion, text_emotion, user_text, history
+            )
+        else:
+            ai_response = gemini_client.get_response(
+                face_emotion=session.face_emotion,
+                text_emotion=text_emotion,
+                user_message=user_text,
+                history=history
+            )
+        
+        # Add to the session's conversation; applied to the latest stored state
+        # so concurrent requests of the session are not lost
         conversation_entry = {
             'user_message': user_text,
             'user_emotion': text_emotion,
             'ai_response': ai_response,
             'timestamp': time.time()
         }
-        conversation_history.append(conversation_entry)
+        
+        def record_exchange(state):
+            state.text_emotion = text_emotion
+            memory = ConversationMemory.from_dict(state.memory, **HISTORY_OPTIONS)
+            memory.add_turn(user_text, ai_response, text_emotion)
+            state.memory = memory.to_dict()
+            return append_message(state, conversation_entry, CONVERSATION_LOG_SIZE)
+        
+        conversation_id = session_store.update(session_id or DEFAULT_SESSION, record_exchange)
         
         return jsonify({
             'ai_response': ai_response,
             'text_emotion': text_emotion,
-            'conversation_id': len(conversation_history) - 1
+            'text_confidence': text_result['confidence'],
+            'text_top_emotions': text_result['top_emotions'],
+            'conversation_id': conversation_id
         })
         
     except Exception as e:
@@ -156,16 +612,59 @@ def process_audio():
 
 @app.route('/api/conversation', methods=['GET'])
 def get_conversation():
-    """Get conversation history"""
+    """Get conversation history of the session given by the session_id query parameter"""
+    session = session_store.get(request.args.get('session_id', DEFAULT_SESSION), include_conversation=True)
     return jsonify({
-        'conversation': conversation_history,
-        'current_emotions': current_emotions
+        'conversation': session.conversation,
+        'current_emotions': session.emotions
     })
 
 @app.route('/api/emotions', methods=['GET'])
 def get_current_emotions():
-    """Get current detected emotions"""
-    return jsonify(current_emotions)
+    """Get current detected emotions of the session given by the session_id query parameter"""
+    return jsonify(session_store.get(request.args.get('session_id', DEFAULT_SESSION)).emotions)
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get batching and cache statistics"""
+    batchers = {
+        name: batcher.get_stats()
+        for name, batcher in globals().items()
+        if isinstance(batcher, MicroBatcher)
+    }
+    return jsonify({
+        'batchers': batchers,
+        'text_cache': emotion_detector.text_cache.get_stats() if emotion_detector.text_cache else None,
+        'gemini': (
+            model_loader.get('gemini_client').get_stats()
+            if model_loader.is_ready('gemini_client') else None
+        ),
+        'sessions': session_store.get_stats(),
+        'model_server': emotion_detector.get_stats() if MODEL_SERVER_ADDRESS else None,
+        'inference_executor': (
+            emotion_detector.inference_executor.get_stats()
+            if getattr(emotion_detector, 'inference_executor', None) else None
+        )
+    })
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness check with the load state and load time of every model"""
+    return jsonify({
+        'status': 'ok',
+        'loading_mode': MODEL_LOADING,
+        'models': model_loader.status(),
+        'import_timings': get_import_timings()
+    })
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness check; 503 until every required model is loaded"""
+    ready = model_loader.all_ready()
+    return jsonify({
+        'ready': ready,
+        'models': model_loader.status()
+    }), 200 if ready else 503
 
 @app.route('/api/speak', methods=['POST'])
 def speak_text():
@@ -183,6 +682,12 @@ def speak_text():
         print(f"Error with text-to-speech: {e}")
         return jsonify({'error': 'Text-to-speech failed'}), 500
 
+# Inference worker processes are started with 'spawn' and import the launch
+# script again as __mp_main__, before parent_process() is set; only the
+# serving process builds the app
+if __name__ != '__mp_main__' and multiprocessing.parent_process() is None:
+    create_app()
+
 if __name__ == '__main__':
     print("Starting Virtual Therapist Backend...")
     print("Make sure to set your GEMINI_API_KEY in the environment variables")
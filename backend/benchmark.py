@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Frame Path Benchmark
+Measures latency percentiles and throughput for each stage of the video frame path:
+base64 decode, JPEG decode, every preprocessing method, face detection and face
+emotion inference, across frame sizes and concurrency levels.
+
+Runs offline on synthetic frames plus the bundled khana.jpeg/rose.jpeg images.
+Use --stub-models in CI to replace the DNN face detector and emotion classifier
+with cheap stand-ins, and --compare to fail on regressions against a saved run.
+
+Usage:
+    python benchmark.py --stub-models --output bench.json
+    python benchmark.py --stub-models --compare bench.json --max-regression 0.2
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from image_preprocessing import ImagePreprocessor, PreprocessingMethod
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_IMAGES = [
+    os.path.join(BACKEND_DIR, '..', 'khana.jpeg'),
+    os.path.join(BACKEND_DIR, '..', 'rose.jpeg')
+]
+
+DEFAULT_FRAME_SIZES = ['320x240', '640x480', '1280x720']
+DEFAULT_CONCURRENCY = [1, 4]
+
+class StubFaceDetector:
+    """
+    Stand-in for the res10 SSD network.
+    Reports one centered face per image in the input blob.
+    """
+
+    def __init__(self):
+        self._batch_size = 1
+
+    def setInput(self, blob):
+        self._batch_size = blob.shape[0]
+
+    def forward(self):
+        detections = np.zeros((1, 1, self._batch_size, 7), dtype=np.float32)
+        for i in range(self._batch_size):
+            detections[0, 0, i] = [i, 1, 0.99, 0.3, 0.25, 0.7, 0.75]
+        return detections
+
+class StubEmotionModel:
+    """
+    Stand-in for the DeepFace emotion classifier.
+    Returns a deterministic distribution derived from the mean pixel value.
+    """
+
+    def predict(self, batch, verbose=0):
+        means = batch.reshape(batch.shape[0], -1).mean(axis=1)
+        predictions = np.full((batch.shape[0], 7), 0.1, dtype=np.float32)
+        predictions[np.arange(batch.shape[0]), (means * 7).astype(int) % 7] += 0.4
+        return predictions
+
+class DetectorPool:
+    """
+    One detector per concurrent benchmark call. cv2.dnn networks (and the stub
+    detector) keep state between setInput and forward, so concurrent calls
+    must not share one.
+    """
+
+    def __init__(self, detectors):
+        self._detectors = queue.Queue()
+        for detector in detectors:
+            self._detectors.put(detector)
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a detector for one call"""
+        detector = self._detectors.get()
+        try:
+            yield detector
+        finally:
+            self._detectors.put(detector)
+
+    def stage(self, method, *args):
+        """
+        Build a stage calling a detector method on a borrowed detector.
+
+        Args:
+            method (str): EmotionDetector method name
+            *args: Method arguments
+
+        Returns:
+            callable: Stage function
+        """
+        def run():
+            with self.checkout() as detector:
+                return getattr(detector, method)(*args)
+        return run
+
+def parse_size(size):
+    """Parse a WIDTHxHEIGHT string"""
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+def load_frames(size, seed=0):
+    """
+    Build the benchmark frames for one frame size.
+
+    Args:
+        size (tuple): Frame size (width, height)
+        seed (int): Seed for the synthetic frame
+
+    Returns:
+        dict: Frame name -> BGR image
+    """
+    rng = np.random.default_rng(seed)
+    frames = {
+        'synthetic': rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    }
+    for path in SAMPLE_IMAGES:
+        image = cv2.imread(path)
+        if image is not None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            frames[name] = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return frames
+
+def measure(fn, iterations, concurrency, warmup=3):
+    """
+    Run fn repeatedly and collect latency statistics.
+
+    Args:
+        fn (callable): Function to benchmark (called without arguments)
+        iterations (int): Total number of calls across all workers
+        concurrency (int): Number of concurrent worker threads
+        warmup (int): Untimed calls made before measuring
+
+    Returns:
+        dict: Latency percentiles in milliseconds and throughput in frames per second
+    """
+    for _ in range(warmup):
+        fn()
+
+    def timed_call(_):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    if concurrency == 1:
+        latencies = [timed_call(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed_call, range(iterations)))
+    wall_time = time.perf_counter() - wall_start
+
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        'iterations': iterations,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(latencies_ms.mean()),
+        'fps': iterations / wall_time if wall_time > 0 else 0.0
+    }
+
+def build_stages(frame, detectors):
+    """
+    Build the benchmarked stages for one frame.
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        detectors (DetectorPool): Emotion detectors, or None to skip model stages
+
+    Returns:
+        list: (stage name, callable) pairs
+    """
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    if not ok:
+        raise RuntimeError("Could not encode benchmark frame")
+    jpeg_bytes = encoded.tobytes()
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(jpeg_bytes).decode('ascii')
+
+    stages = [
+        ('base64_decode', lambda: base64.b64decode(data_url.split(',')[1])),
+        ('imdecode', lambda: cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR))
+    ]
+
+    for method in PreprocessingMethod:
+        preprocessor = ImagePreprocessor(preprocessing_method=method)
+        stages.append((f'preprocess_{method.value}', lambda p=preprocessor: p.preprocess(frame)))
+
+    if detectors is not None:
+        processed = ImagePreprocessor().preprocess(frame)
+        stages.append(('detect_faces', detectors.stage('detect_faces', processed)))
+        stages.append(('face_emotion_batch_1', detectors.stage('get_face_emotion_confidences', [processed])))
+        stages.append(('face_emotion_batch_8', detectors.stage('get_face_emotion_confidences', [processed] * 8)))
+
+    return stages
+
+def create_detector(stub_models):
+    """
+    Create the emotion detector used for model stages.
+
+    Args:
+        stub_models (bool): Use stub models instead of the real networks
+
+    Returns:
+        EmotionDetector: Detector without the text model, or None if unavailable
+    """
+    try:
+        from emotion_detector import EmotionDetector
+    except ImportError as e:
+        print(f"Warning: Skipping model stages, could not import EmotionDetector: {e}")
+        return None
+
+    if stub_models:
+        return EmotionDetector(
+            face_detector=StubFaceDetector(),
+            face_emotion_model=StubEmotionModel(),
+            load_text_model=False
+        )
+
+    cwd = os.getcwd()
+    try:
+        # Model files are resolved relative to the backend directory
+        os.chdir(BACKEND_DIR)
+        detector = EmotionDetector(load_text_model=False)
+    finally:
+        os.chdir(cwd)
+
+    # Build the emotion model now so no timed call includes it
+    try:
+        detector.load_face_emotion_model()
+    except Exception as e:
+        print(f"Warning: Could not load face emotion model: {e}")
+    return detector
+
+def create_detector_pool(stub_models, size):
+    """
+    Create one detector per concurrent benchmark thread.
+
+    Args:
+        stub_models (bool): Use stub models instead of the real networks
+        size (int): Number of detectors (the highest concurrency level)
+
+    Returns:
+        DetectorPool: Detectors, or None if EmotionDetector is unavailable
+    """
+    detector = create_detector(stub_models)
+    if detector is None:
+        return None
+    return DetectorPool([detector] + [create_detector(stub_models) for _ in range(size - 1)])
+
+def run_benchmarks(frame_sizes, concurrency_levels, iterations, stub_models, stage_filter=None):
+    """
+    Run every stage for every frame size, sample image and concurrency level.
+
+    Returns:
+        dict: Machine-readable benchmark results
+    """
+    detectors = create_detector_pool(stub_models, max(concurrency_levels))
+    results = []
+
+    for size_name in frame_sizes:
+        size = parse_size(size_name)
+        for frame_name, frame in load_frames(size).items():
+            for stage_name, fn in build_stages(frame, detectors):
+                if stage_filter and stage_filter not in stage_name:
+                    continue
+                for concurrency in concurrency_levels:
+                    stats = measure(fn, iterations, concurrency)
+                    stats.update({
+                        'stage': stage_name,
+                        'frame_size': size_name,
+                        'frame': frame_name,
+                        'concurrency': concurrency
+                    })
+                    results.append(stats)
+                    print(
+                        f"{stage_name:<40} {size_name:>9} {frame_name:<10} c={concurrency:<3} "
+                        f"p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms "
+                        f"p99={stats['p99_ms']:8.3f}ms fps={stats['fps']:9.1f}"
+                    )
+
+    return {
+        'metadata': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'stub_models': stub_models,
+            'iterations': iterations
+        },
+        'results': results
+    }
+
+def result_key(result):
+    """Key identifying the same measurement across runs"""
+    return (result['stage'], result['frame_size'], result['frame'], result['concurrency'])
+
+def compare_results(baseline, current, max_regression):
+    """
+    Compare p95 latencies against a baseline run.
+
+    Args:
+        baseline (dict): Previously saved results
+        current (dict): Results of this run
+        max_regression (float): Allowed relative p95 increase (0.2 = 20%)
+
+    Returns:
+        list: Descriptions of measurements that regressed
+    """
+    baseline_by_key = {result_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        previous = baseline_by_key.get(result_key(result))
+        if previous is None or previous['p95_ms'] <= 0:
+            continue
+        change = result['p95_ms'] / previous['p95_ms'] - 1.0
+        if change > max_regression:
+            regressions.append(
+                f"{result['stage']} {result['frame_size']} {result['frame']} c={result['concurrency']}: "
+                f"p95 {previous['p95_ms']:.3f}ms -> {result['p95_ms']:.3f}ms (+{change * 100:.1f}%)"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the video frame path")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_FRAME_SIZES,
+                        help="Frame sizes as WIDTHxHEIGHT")
+    parser.add_argument('--concurrency', nargs='+', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Concurrency levels (worker threads)")
+    parser.add_argument('--iterations', type=int, default=50,
+                        help="Timed calls per stage, size, frame and concurrency level")
+    parser.add_argument('--stub-models', action='store_true',
+                        help="Replace the DNN detector and emotion classifier with stubs")
+    parser.add_argument('--stage', default=None,
+                        help="Only run stages whose name contains this string")
+    parser.add_argument('--opencv-threads', type=int, default=None,
+                        help="Limit OpenCV's internal thread pool (e.g. 1 for per-core numbers)")
+    parser.add_argument('--output', default=None,
+                        help="Write JSON results to this file")
+    parser.add_argument('--compare', default=None,
+                        help="Baseline JSON results to check for regressions")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed relative p95 increase before failing")
+    args = parser.parse_args()
+
+    if args.opencv_threads is not None:
+        cv2.setNumThreads(args.opencv_threads)
+
+    results = run_benchmarks(args.sizes, args.concurrency, args.iterations,
+                             args.stub_models, args.stage)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.max_regression)
+        if regressions:
+            print("Performance regressions detected:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No performance regressions detected")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
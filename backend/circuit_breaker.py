@@ -0,0 +1,158 @@
+"""
+Circuit Breaker Module
+Tracks the outcome and latency of recent calls to an external service and
+stops sending requests while it is failing or too slow, so callers can
+answer immediately instead of waiting for timeouts.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+class CircuitBreaker:
+    """
+    Sliding-window circuit breaker.
+
+    closed: calls go through and outcomes are recorded.
+    open: calls are rejected until open_duration has passed.
+    half_open: a few probe calls go through; success closes the breaker, failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window_size: int = 20,
+                 min_calls: int = 5, slow_call_seconds: Optional[float] = None,
+                 open_duration: float = 30.0, half_open_calls: int = 1, name: str = "breaker"):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_rate_threshold: Fraction of failed or slow calls in the window that opens the breaker
+            window_size: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker can open
+            slow_call_seconds: Calls slower than this count as failures (None = latency ignored)
+            open_duration: Seconds the breaker stays open before probing again
+            half_open_calls: Probe calls allowed while half open
+            name: Name used in log messages
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = max(1, int(window_size))
+        self.min_calls = max(1, int(min_calls))
+        self.slow_call_seconds = slow_call_seconds
+        self.open_duration = open_duration
+        self.half_open_calls = max(1, int(half_open_calls))
+        self.name = name
+
+        self._state = self.CLOSED
+        self._window = deque(maxlen=self.window_size)
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half open once open_duration has passed"""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def _refresh_state(self):
+        """Move from open to half open when the open period is over (lock held)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go through. Every allowed call must be followed
+        by record_success or record_failure.
+
+        Returns:
+            bool: True if the call should be made
+        """
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_calls:
+                self._probes_in_flight += 1
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self, latency: float):
+        """
+        Record a completed call.
+
+        Args:
+            latency: Call duration in seconds
+        """
+        slow = self.slow_call_seconds is not None and latency > self.slow_call_seconds
+        self._record(not slow, latency)
+
+    def record_failure(self, latency: float):
+        """
+        Record a failed call.
+
+        Args:
+            latency: Call duration in seconds
+        """
+        self._record(False, latency)
+
+    def _record(self, ok: bool, latency: float):
+        """Add an outcome to the window and update the state"""
+        with self._lock:
+            self._window.append((ok, latency))
+
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if ok:
+                    self._state = self.CLOSED
+                    self._window.clear()
+                else:
+                    self._open()
+                return
+
+            if self._state == self.CLOSED and len(self._window) >= self.min_calls:
+                failures = sum(1 for call_ok, _ in self._window if not call_ok)
+                if failures / len(self._window) >= self.failure_rate_threshold:
+                    self._open()
+
+    def _open(self):
+        """Open the breaker (lock held)"""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        print(f"Warning: {self.name} circuit breaker opened")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker statistics.
+
+        Returns:
+            dict: State, failure rate and latency over the window, rejected calls and times opened
+        """
+        with self._lock:
+            self._refresh_state()
+            calls = list(self._window)
+            latencies = sorted(latency for _, latency in calls)
+            failures = sum(1 for ok, _ in calls if not ok)
+            return {
+                'state': self._state,
+                'window_calls': len(calls),
+                'failure_rate': failures / len(calls) if calls else 0.0,
+                'average_latency_ms': sum(latencies) / len(latencies) * 1000.0 if latencies else 0.0,
+                'p95_latency_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000.0 if latencies else 0.0,
+                'rejected_calls': self.rejected_calls,
+                'times_opened': self.times_opened,
+                'seconds_until_half_open': (
+                    max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+                    if self._state == self.OPEN else 0.0
+                )
+            }
@@ -0,0 +1,213 @@
+"""
+Conversation Memory Module
+Bounded per-session conversation context for prompting.
+The most recent exchanges are kept verbatim in a ring buffer; older ones are
+folded into a rolling summary one at a time as they leave the buffer, so the
+context handed to the model stays within a fixed token budget however long
+the session runs. Memories serialize to small dicts kept in the session store.
+"""
+
+import re
+import threading
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+def estimate_tokens(text: str, chars_per_token: int = 4) -> int:
+    """
+    Cheap token estimate used for budgeting.
+
+    Args:
+        text: Text to measure
+        chars_per_token: Average characters per token
+
+    Returns:
+        Estimated token count
+    """
+    return len(text) // chars_per_token + 1
+
+def truncate_to_tokens(text: str, max_tokens: int, chars_per_token: int = 4) -> str:
+    """
+    Shorten text to roughly max_tokens, cutting at a word boundary.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token limit
+        chars_per_token: Average characters per token
+
+    Returns:
+        Text within the limit
+    """
+    max_chars = max_tokens * chars_per_token
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(' ', 1)[0] + '...'
+
+class ConversationMemory:
+    """
+    Recent turns plus a rolling summary for one session.
+    """
+
+    def __init__(self, max_turns: int = 6, token_budget: int = 600, max_turn_tokens: int = 120,
+                 summary_token_budget: int = 150, chars_per_token: int = 4):
+        """
+        Initialize the memory.
+
+        Args:
+            max_turns: Exchanges kept verbatim
+            token_budget: Token limit for the whole context (summary plus turns)
+            max_turn_tokens: Token limit for each stored message
+            summary_token_budget: Token limit for the rolling summary
+            chars_per_token: Average characters per token used for estimates
+        """
+        self.max_turns = max(1, int(max_turns))
+        self.token_budget = token_budget
+        self.max_turn_tokens = max_turn_tokens
+        self.summary_token_budget = summary_token_budget
+        self.chars_per_token = chars_per_token
+
+        self.turns = deque(maxlen=self.max_turns)
+        self.summarized_turns = 0
+        self._emotion_counts = Counter()
+        self._topics = deque()
+        self._topic_tokens = 0
+        self._summary = ''
+        self._lock = threading.Lock()
+
+    def add_turn(self, user_message: str, ai_response: str, user_emotion: str = 'neutral'):
+        """
+        Record one exchange, folding the oldest stored exchange into the summary if the buffer is full.
+
+        Args:
+            user_message: User's message
+            ai_response: Therapist response
+            user_emotion: Emotion detected for the message
+        """
+        turn = {
+            'user_message': truncate_to_tokens(user_message, self.max_turn_tokens, self.chars_per_token),
+            'ai_response': truncate_to_tokens(ai_response, self.max_turn_tokens, self.chars_per_token),
+            'user_emotion': user_emotion
+        }
+        with self._lock:
+            if len(self.turns) == self.max_turns:
+                self._fold_into_summary(self.turns[0])
+            self.turns.append(turn)
+
+    def _fold_into_summary(self, turn: Dict[str, str]):
+        """Update the rolling summary with one exchange leaving the buffer (lock held)"""
+        self.summarized_turns += 1
+        self._emotion_counts[turn['user_emotion']] += 1
+
+        # Keep the first sentence of the user's message as a topic note
+        topic = SENTENCE_END.split(turn['user_message'].strip(), 1)[0]
+        topic = truncate_to_tokens(topic, 25, self.chars_per_token)
+        self._topics.append(topic)
+        self._topic_tokens += estimate_tokens(topic, self.chars_per_token)
+
+        # Oldest topics drop out first once the summary is over budget
+        topic_budget = self.summary_token_budget - 30
+        while len(self._topics) > 1 and self._topic_tokens > topic_budget:
+            self._topic_tokens -= estimate_tokens(self._topics.popleft(), self.chars_per_token)
+
+        emotions = ', '.join(f"{emotion} ({count})" for emotion, count in self._emotion_counts.most_common(3))
+        self._summary = (
+            f"Earlier in this session ({self.summarized_turns} exchanges) the user mostly felt {emotions}. "
+            f"They talked about: {'; '.join(self._topics)}"
+        )
+
+    def get_context(self) -> Dict[str, Any]:
+        """
+        Get the context for the next prompt, newest turns first to fill the budget.
+
+        Returns:
+            dict: 'summary' (str) and 'turns' (list, oldest first) within the token budget
+        """
+        with self._lock:
+            summary = self._summary
+            turns = list(self.turns)
+
+        remaining = self.token_budget - (estimate_tokens(summary, self.chars_per_token) if summary else 0)
+        selected = []
+        for turn in reversed(turns):
+            cost = (
+                estimate_tokens(turn['user_message'], self.chars_per_token)
+                + estimate_tokens(turn['ai_response'], self.chars_per_token)
+            )
+            if cost > remaining:
+                break
+            selected.append(turn)
+            remaining -= cost
+
+        selected.reverse()
+        return {'summary': summary, 'turns': selected}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the memory for a session store.
+
+        Returns:
+            dict: JSON-serializable state
+        """
+        with self._lock:
+            return {
+                'turns': list(self.turns),
+                'summarized_turns': self.summarized_turns,
+                'emotion_counts': dict(self._emotion_counts),
+                'topics': list(self._topics),
+                'topic_tokens': self._topic_tokens,
+                'summary': self._summary
+            }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], **options) -> 'ConversationMemory':
+        """
+        Restore a memory serialized with to_dict.
+
+        Args:
+            data: Serialized state, or None for an empty memory
+            **options: Constructor options; turns beyond max_turns are dropped
+
+        Returns:
+            ConversationMemory: Restored memory
+        """
+        memory = cls(**options)
+        if data:
+            memory.turns.extend(data.get('turns', []))
+            memory.summarized_turns = data.get('summarized_turns', 0)
+            memory._emotion_counts.update(data.get('emotion_counts', {}))
+            memory._topics.extend(data.get('topics', []))
+            memory._topic_tokens = data.get('topic_tokens', 0)
+            memory._summary = data.get('summary', '')
+        return memory
+
+    def clear(self):
+        """Forget the session's conversation"""
+        with self._lock:
+            self.turns.clear()
+            self.summarized_turns = 0
+            self._emotion_counts.clear()
+            self._topics.clear()
+            self._topic_tokens = 0
+            self._summary = ''
+
+# Example usage: context size stays flat over a long session
+if __name__ == "__main__":
+    import time
+
+    memory = ConversationMemory()
+    emotions = ['sadness', 'nervousness', 'neutral', 'joy']
+    for turn in range(1, 361):
+        memory.add_turn(
+            f"This is message {turn}. I keep thinking about work and how tired I feel lately.",
+            "That sounds exhausting. What part of work weighs on you the most right now?",
+            emotions[turn % len(emotions)]
+        )
+        if turn in (1, 10, 60, 360):
+            start = time.perf_counter()
+            context = memory.get_context()
+            elapsed = (time.perf_counter() - start) * 1000.0
+            size = len(context['summary']) + sum(
+                len(t['user_message']) + len(t['ai_response']) for t in context['turns']
+            )
+            print(f"after {turn:3d} turns: {len(context['turns'])} turns kept, {size} chars, {elapsed:.3f}ms")
@@ -1,35 +1,241 @@
 """
 Emotion Detection Module
 Handles both facial emotion detection using DeepFace and text emotion detection using EmoRoBERTa.
+DeepFace (TensorFlow), transformers and torch are imported only when the model
+that needs them is loaded, so importing this module stays cheap.
 """
 
+import os
+import re
 import cv2
 import numpy as np
-import torch
-from deepface import DeepFace
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import threading
+from collections import OrderedDict
+from face_tracker import FaceTracker
+from lru_cache import LRUCache
+from import_timing import timed_import
 import warnings
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 
+# Output order of the DeepFace emotion classifier
+FACE_EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Input size expected by the DeepFace emotion classifier
+FACE_EMOTION_INPUT_SIZE = (48, 48)
+
+# Hugging Face model used for text emotion detection
+TEXT_EMOTION_MODEL_NAME = "arpanghoshal/EmoRoBERTa"
+
+# Supported text inference backends
+TEXT_BACKENDS = ('torch', 'torch_int8', 'onnx')
+
+# Sentence boundaries used to split long messages into windows
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+class EmotionAnalysis:
+    """
+    Result of one emotion analysis: the dominant label together with the
+    full probability distribution it was taken from.
+    """
+    
+    def __init__(self, scores, source):
+        """
+        Initialize the analysis result.
+        
+        Args:
+            scores (dict): Emotion label -> probability
+            source (str): 'face' or 'text'
+        """
+        self.scores = scores if scores else {'neutral': 1.0}
+        self.source = source
+        self.label = max(self.scores, key=self.scores.get)
+    
+    @classmethod
+    def neutral(cls, source):
+        """Analysis used when no model is available or inference failed"""
+        return cls({'neutral': 1.0}, source)
+    
+    @property
+    def confidence(self):
+        """Probability of the dominant label"""
+        return self.scores[self.label]
+    
+    def top_k(self, k=3):
+        """
+        Get the k most likely emotions.
+        
+        Args:
+            k (int): Number of emotions to return
+            
+        Returns:
+            list: (label, probability) pairs, most likely first
+        """
+        return sorted(self.scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    
+    def to_dict(self, k=3):
+        """
+        Convert the analysis to a JSON-serializable dictionary.
+        
+        Args:
+            k (int): Number of top emotions to include
+            
+        Returns:
+            dict: Label, confidence, top emotions and full scores
+        """
+        return {
+            'label': self.label,
+            'confidence': self.confidence,
+            'top_emotions': [{'label': label, 'score': score} for label, score in self.top_k(k)],
+            'scores': self.scores
+        }
+
 class EmotionDetector:
     """
     Comprehensive emotion detection for both facial expressions and text.
     """
     
-    def __init__(self):
-        """Initialize emotion detection models"""
-        self.face_detector = None
+    def __init__(self, face_redetect_interval=10, max_tracked_sessions=256,
+                 face_detector=None, face_emotion_model=None, load_text_model=True,
+                 text_cache_size=1024, text_cache_ttl=3600, text_cache_path=None,
+                 text_backend='torch', onnx_model_path='emoroberta.onnx', onnx_threads=None,
+                 text_max_tokens=512, text_windowing=False, text_max_windows=8, load_models=True,
+                 inference_executor=None):
+        """
+        Initialize emotion detection models.
+        
+        Args:
+            face_redetect_interval (int): Frames a session's face is tracked before the detector runs again
+            max_tracked_sessions (int): Maximum number of per-session face trackers kept
+            face_detector (optional): Preloaded face detection network (anything with setInput/forward)
+            face_emotion_model (optional): Preloaded face emotion classifier (anything with predict)
+            load_text_model (bool): Whether to load the text emotion model
+            text_cache_size (int): Maximum cached text results (0 disables the cache)
+            text_cache_ttl (float): Seconds a cached text result stays valid (None = no expiry)
+            text_cache_path (str, optional): SQLite file used to keep the text cache across restarts
+            text_backend (str): 'torch' (fp32), 'torch_int8' (dynamic int8 quantization) or 'onnx' (ONNX Runtime)
+            onnx_model_path (str): Exported ONNX graph, created on first use of the 'onnx' backend
+            onnx_threads (int, optional): ONNX Runtime intra-op threads (None = runtime default)
+            text_max_tokens (int): Token cap per forward-pass sequence, bounds per-message latency
+            text_windowing (bool): Split messages longer than text_max_tokens into sentence windows
+                and aggregate their probabilities instead of truncating
+            text_max_windows (int): Maximum windows classified per message
+            load_models (bool): Load models now; when False call the load_* methods later
+                (e.g. from background threads)
+            inference_executor (InferenceExecutor, optional): Runs the face detection and
+                classification passes on a worker pool instead of the calling thread
+        """
+        if text_backend not in TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend: {text_backend}")
+        self.face_redetect_interval = face_redetect_interval
+        self.max_tracked_sessions = max_tracked_sessions
+        self.face_trackers = OrderedDict()
+        self._tracker_lock = threading.Lock()
+        self.face_detector = face_detector
+        self.face_emotion_model = face_emotion_model
+        self._face_model_lock = threading.Lock()
+        self.text_backend = text_backend
+        self.onnx_model_path = onnx_model_path
+        self.onnx_threads = onnx_threads
+        self.text_max_tokens = min(512, max(8, int(text_max_tokens)))
+        self.text_windowing = text_windowing
+        self.text_max_windows = max(1, int(text_max_windows))
         self.text_tokenizer = None
         self.text_model = None
+        self.text_session = None
         self.emotion_labels = None
         
+        self.inference_executor = inference_executor
+        
+        # Text results keyed by normalized text
+        self.text_cache = None
+        if text_cache_size:
+            self.text_cache = LRUCache(
+                max_size=text_cache_size,
+                ttl=text_cache_ttl,
+                persist_path=text_cache_path,
+                name=f'text_emotions_{text_backend}'
+            )
+        
+        if not load_models:
+            return
+        
         # Initialize face detection
-        self._initialize_face_detection()
+        if self.face_detector is None:
+            self._initialize_face_detection()
         
         # Initialize text emotion detection
-        self._initialize_text_emotion_detection()
+        if load_text_model:
+            self._initialize_text_emotion_detection()
+    
+    def load_face_detection_model(self):
+        """
+        Load the SSD face detector if it is not loaded yet.
+        
+        Returns:
+            The face detection network
+            
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        if self.face_detector is None:
+            self._initialize_face_detection()
+        if self.face_detector is None:
+            raise RuntimeError("Face detection model could not be loaded")
+        return self.face_detector
+    
+    def load_face_emotion_model(self):
+        """
+        Build the face emotion classifier if it is not built yet.
+        
+        Returns:
+            The face emotion classifier
+        """
+        return self._get_face_emotion_model()
+    
+    def load_text_emotion_model(self):
+        """
+        Load the text emotion model on the configured backend if it is not loaded yet.
+        
+        Returns:
+            str: Name of the active text backend
+            
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        if not self._text_model_available():
+            self._initialize_text_emotion_detection()
+        if not self._text_model_available():
+            raise RuntimeError("Text emotion model could not be loaded")
+        return self.text_backend
+    
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        Create a detector configured from environment variables.
+        Shared by the Flask app and the standalone model server.
+        
+        Args:
+            **overrides: Constructor arguments that take precedence over the environment
+            
+        Returns:
+            EmotionDetector: Configured detector
+        """
+        options = {
+            'face_redetect_interval': int(os.getenv('FACE_REDETECT_INTERVAL', '10')),
+            'text_cache_size': int(os.getenv('TEXT_CACHE_SIZE', '1024')),
+            'text_cache_ttl': float(os.getenv('TEXT_CACHE_TTL', '3600')) or None,
+            'text_cache_path': os.getenv('TEXT_CACHE_PATH') or None,
+            'text_backend': os.getenv('TEXT_BACKEND', 'torch'),
+            'onnx_model_path': os.getenv('TEXT_ONNX_PATH', 'emoroberta.onnx'),
+            'onnx_threads': int(os.getenv('TEXT_ONNX_THREADS', '0')) or None,
+            'text_max_tokens': int(os.getenv('TEXT_MAX_TOKENS', '128')),
+            'text_windowing': os.getenv('TEXT_WINDOWING', 'true').lower() in ('1', 'true', 'yes'),
+            'text_max_windows': int(os.getenv('TEXT_MAX_WINDOWS', '8'))
+        }
+        options.update(overrides)
+        return cls(**options)
     
     def _initialize_face_detection(self):
         """Initialize face detection using OpenCV DNN"""
@@ -45,11 +251,12 @@ class EmotionDetector:
             self.face_detector = None
     
     def _initialize_text_emotion_detection(self):
-        """Initialize text emotion detection using EmoRoBERTa"""
+        """Initialize text emotion detection using EmoRoBERTa on the selected backend"""
         try:
-            model_name = "arpanghoshal/EmoRoBERTa"
-            self.text_tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.text_model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            with timed_import('transformers'):
+                from transformers import AutoTokenizer
+            
+            self.text_tokenizer = AutoTokenizer.from_pretrained(TEXT_EMOTION_MODEL_NAME)
             
             # EmoRoBERTa emotion labels
             self.emotion_labels = [
@@ -60,44 +267,338 @@ class EmotionDetector:
                 'sadness', 'surprise', 'neutral'
             ]
             
-            print("Text emotion detection model loaded successfully")
+            if self.text_backend == 'onnx':
+                # Skips torch entirely when the exported graph already exists
+                self._initialize_onnx_text_session()
+            
+            if self.text_backend != 'onnx':
+                self.text_model = self._load_torch_text_model()
+            
+            if self.text_backend == 'torch_int8':
+                import torch
+                # Quantize Linear layer weights to int8; activations are quantized on the fly
+                self.text_model = torch.quantization.quantize_dynamic(
+                    self.text_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            
+            print(f"Text emotion detection model loaded successfully ({self.text_backend} backend)")
         except Exception as e:
             print(f"Warning: Could not load text emotion model: {e}")
             self.text_tokenizer = None
             self.text_model = None
+            self.text_session = None
             self.emotion_labels = None
     
-    def detect_faces(self, image, confidence_threshold=0.5):
+    def _load_torch_text_model(self):
+        """
+        Load the fp32 EmoRoBERTa torch model.
+        
+        Returns:
+            The model in eval mode
+        """
+        with timed_import('torch'):
+            import torch
+        with timed_import('transformers.models'):
+            from transformers import AutoModelForSequenceClassification
+        
+        model = AutoModelForSequenceClassification.from_pretrained(TEXT_EMOTION_MODEL_NAME)
+        model.eval()
+        return model
+    
+    def _initialize_onnx_text_session(self):
+        """Export EmoRoBERTa to ONNX if needed and load it into ONNX Runtime"""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            print("Warning: onnxruntime is not installed, falling back to the torch text backend")
+            self.text_backend = 'torch'
+            return
+        
+        if not os.path.exists(self.onnx_model_path):
+            self.text_model = self._load_torch_text_model()
+            self.export_text_model_onnx(self.onnx_model_path)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if self.onnx_threads:
+            options.intra_op_num_threads = self.onnx_threads
+        
+        self.text_session = ort.InferenceSession(
+            self.onnx_model_path, options, providers=['CPUExecutionProvider']
+        )
+        
+        # The ONNX session replaces the torch model, which is freed
+        self.text_model = None
+    
+    def export_text_model_onnx(self, path):
+        """
+        Export the loaded torch text model to an ONNX graph with dynamic batch and sequence axes.
+        
+        Args:
+            path (str): Output file
+        """
+        import torch
+        
+        sample = self.text_tokenizer(["ONNX export sample"], return_tensors="pt")
+        torch.onnx.export(
+            self.text_model,
+            (sample['input_ids'], sample['attention_mask']),
+            path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=14
+        )
+        print(f"Exported text emotion model to {path}")
+    
+    def _text_model_available(self):
+        """Whether a text model is loaded on any backend"""
+        return (
+            self.text_tokenizer is not None
+            and (self.text_model is not None or self.text_session is not None)
+            and bool(self.emotion_labels)
+        )
+    
+    def _predict_text_probabilities(self, texts, max_length=None):
+        """
+        Run one padded forward pass on the active text backend.
+        
+        Args:
+            texts (list): Input texts
+            max_length (int, optional): Maximum tokens per text; defaults to text_max_tokens
+            
+        Returns:
+            list: Softmax probability rows, one per text
+        """
+        max_length = max_length or self.text_max_tokens
+        
+        if self.text_session is not None:
+            inputs = self.text_tokenizer(
+                texts,
+                return_tensors="np",
+                truncation=True,
+                max_length=max_length,
+                padding=True
+            )
+            logits = self.text_session.run(
+                ['logits'],
+                {
+                    'input_ids': inputs['input_ids'].astype(np.int64),
+                    'attention_mask': inputs['attention_mask'].astype(np.int64)
+                }
+            )[0]
+            logits = logits - logits.max(axis=-1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=-1, keepdims=True)
+            return probabilities.tolist()
+        
+        import torch
+        
+        inputs = self.text_tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            max_length=max_length,
+            padding=True
+        )
+        with torch.no_grad():
+            outputs = self.text_model(**inputs)
+            return torch.softmax(outputs.logits, dim=-1).tolist()
+    
+    def verify_text_backend_parity(self, texts):
+        """
+        Compare the active text backend against the fp32 torch model.
+        
+        Args:
+            texts (list): Texts to compare on
+            
+        Returns:
+            dict: Agreement rate of the top labels, the texts whose labels differ and
+                the largest absolute difference between the probabilities
+        """
+        import torch
+        
+        reference = self._load_torch_text_model()
+        
+        inputs = self.text_tokenizer(texts, return_tensors="pt", truncation=True, max_length=512, padding=True)
+        with torch.no_grad():
+            reference_probabilities = torch.softmax(reference(**inputs).logits, dim=-1).numpy()
+        backend_probabilities = np.asarray(self._predict_text_probabilities(texts, max_length=512))
+        
+        reference_ids = reference_probabilities.argmax(axis=-1).tolist()
+        backend_ids = backend_probabilities.argmax(axis=-1).tolist()
+        
+        mismatches = [
+            {
+                'text': text,
+                'fp32': self.emotion_labels[reference_id],
+                self.text_backend: self.emotion_labels[backend_id]
+            }
+            for text, reference_id, backend_id in zip(texts, reference_ids, backend_ids)
+            if reference_id != backend_id
+        ]
+        
+        return {
+            'backend': self.text_backend,
+            'agreement': 1.0 - len(mismatches) / len(texts) if texts else 1.0,
+            'mismatches': mismatches,
+            'max_abs_diff': float(np.abs(reference_probabilities - backend_probabilities).max()) if texts else 0.0
+        }
+    
+    def _get_face_tracker(self, session_id):
+        """
+        Get the face tracker for a session, creating it if needed.
+        Least recently used trackers are dropped beyond max_tracked_sessions.
+        
+        Args:
+            session_id (str): Session identifier
+            
+        Returns:
+            FaceTracker: Tracker for the session
+        """
+        with self._tracker_lock:
+            tracker = self.face_trackers.get(session_id)
+            if tracker is None:
+                tracker = FaceTracker(redetect_interval=self.face_redetect_interval)
+                self.face_trackers[session_id] = tracker
+                while len(self.face_trackers) > self.max_tracked_sessions:
+                    self.face_trackers.popitem(last=False)
+            else:
+                self.face_trackers.move_to_end(session_id)
+            return tracker
+    
+    def reset_face_tracker(self, session_id):
+        """
+        Drop the face tracker of a session.
+        
+        Args:
+            session_id (str): Session identifier
+        """
+        with self._tracker_lock:
+            self.face_trackers.pop(session_id, None)
+    
+    def detect_faces(self, image, confidence_threshold=0.5, session_id=None):
         """
         Detect faces in an image using OpenCV DNN.
         
         Args:
             image (numpy.ndarray): Input image
             confidence_threshold (float): Minimum confidence for face detection
+            session_id (str, optional): Video session the frame belongs to, enables face tracking
             
         Returns:
             list: List of face bounding boxes and confidence scores
         """
-        if self.face_detector is None:
-            return []
+        return self.detect_faces_batch([image], confidence_threshold, [session_id])[0]
+    
+    def detect_faces_batch(self, images, confidence_threshold=0.5, session_ids=None):
+        """
+        Detect faces in several images with a single DNN forward pass.
+        
+        Frames from sessions with a valid tracked face reuse the tracked box;
+        only the remaining frames go through the detector.
+        
+        Args:
+            images (list): Input images
+            confidence_threshold (float): Minimum confidence for face detection
+            session_ids (list, optional): Session identifier per image (None disables tracking)
+            
+        Returns:
+            list: One list of face bounding boxes and confidence scores per image
+        """
+        if session_ids is None:
+            session_ids = [None] * len(images)
+        
+        # Tracking stays in this process; only the detector runs on the executor
+        can_detect = self.face_detector is not None or self.inference_executor is not None
+        
+        faces = [None] * len(images)
+        trackers = [None] * len(images)
+        pending = []
+        for i, (image, session_id) in enumerate(zip(images, session_ids)):
+            if session_id is not None and can_detect:
+                trackers[i] = self._get_face_tracker(session_id)
+                tracked = trackers[i].track(image)
+                if tracked is not None:
+                    faces[i] = tracked
+                    continue
+            pending.append(i)
+        
+        if pending:
+            detected = self._run_face_detector([images[i] for i in pending], confidence_threshold)
+            for i, image_faces in zip(pending, detected):
+                faces[i] = image_faces
+                if trackers[i] is not None:
+                    trackers[i].update(images[i], image_faces)
+        
+        return faces
+    
+    def _run_face_detector(self, images, confidence_threshold):
+        """
+        Run the SSD face detector over a batch of images, on the inference executor if one is set.
+        
+        Args:
+            images (list): Input images
+            confidence_threshold (float): Minimum confidence for face detection
+            
+        Returns:
+            list: One list of face bounding boxes and confidence scores per image
+        """
+        if self.inference_executor is not None:
+            try:
+                return self.inference_executor.run('detect_faces', images, confidence_threshold)
+            except Exception as e:
+                print(f"Error in face detection: {e}")
+                return [[] for _ in images]
+        
+        return self._detect_faces_local(images, confidence_threshold)
+    
+    def _detect_faces_local(self, images, confidence_threshold):
+        """
+        Run the SSD face detector over a batch of images in one forward pass.
+        
+        Args:
+            images (list): Input images
+            confidence_threshold (float): Minimum confidence for face detection
+            
+        Returns:
+            list: One list of face bounding boxes and confidence scores per image
+        """
+        if self.face_detector is None or not images:
+            return [[] for _ in images]
         
         try:
-            h, w = image.shape[:2]
+            resized = []
+            for image in images:
+                if len(image.shape) == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+                resized.append(cv2.resize(image, (300, 300)))
             
-            # Prepare input blob
-            blob = cv2.dnn.blobFromImage(
-                cv2.resize(image, (300, 300)), 1.0,
+            # Prepare input blob with one entry per image
+            blob = cv2.dnn.blobFromImages(
+                resized, 1.0,
                 (300, 300), (104.0, 177.0, 123.0)
             )
             
             self.face_detector.setInput(blob)
             detections = self.face_detector.forward()
             
-            faces = []
+            faces = [[] for _ in images]
             for i in range(detections.shape[2]):
                 confidence = detections[0, 0, i, 2]
                 
                 if confidence > confidence_threshold:
+                    # First column holds the index of the image in the batch
+                    image_index = int(detections[0, 0, i, 0])
+                    if not 0 <= image_index < len(images):
+                        continue
+                    
+                    h, w = images[image_index].shape[:2]
                     box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
                     (x, y, x2, y2) = box.astype("int")
                     
@@ -107,7 +608,7 @@ class EmotionDetector:
                     x2 = min(w, x2)
                     y2 = min(h, y2)
                     
-                    faces.append({
+                    faces[image_index].append({
                         'bbox': (x, y, x2, y2),
                         'confidence': confidence
                     })
@@ -116,46 +617,352 @@ class EmotionDetector:
             
         except Exception as e:
             print(f"Error in face detection: {e}")
+            return [[] for _ in images]
+    
+    @staticmethod
+    def extract_face_roi(image, faces):
+        """
+        Crop the highest-confidence face from an image.
+        
+        Args:
+            image (numpy.ndarray): Input image
+            faces (list): Faces returned by detect_faces
+            
+        Returns:
+            numpy.ndarray: Face crop, or the whole image if no usable face was found
+        """
+        if not faces:
+            return image
+        
+        best_face = max(faces, key=lambda face: face['confidence'])
+        x, y, x2, y2 = best_face['bbox']
+        face = image[y:y2, x:x2]
+        
+        if face.shape[0] == 0 or face.shape[1] == 0:
+            return image
+        
+        return face
+    
+    def _get_face_emotion_model(self):
+        """Build the DeepFace emotion classifier on first use"""
+        if self.face_emotion_model is None:
+            with self._face_model_lock:
+                if self.face_emotion_model is None:
+                    with timed_import('deepface'):
+                        from deepface import DeepFace
+                    self.face_emotion_model = DeepFace.build_model("Emotion")
+        return self.face_emotion_model
+    
+    def _classify_faces(self, faces):
+        """
+        Classify face crops, on the inference executor if one is set.
+        
+        Args:
+            faces (list): Face crops (BGR or grayscale)
+            
+        Returns:
+            list: Emotion probability dictionaries, one per face
+        """
+        if self.inference_executor is not None:
+            return self.inference_executor.run('classify_faces', faces)
+        return self._classify_faces_local(faces)
+    
+    def _classify_faces_local(self, faces):
+        """
+        Classify several face crops with a single forward pass of the emotion model.
+        
+        Args:
+            faces (list): Face crops (BGR or grayscale)
+            
+        Returns:
+            list: Emotion probability dictionaries, one per face
+        """
+        batch = np.empty((len(faces),) + FACE_EMOTION_INPUT_SIZE + (1,), dtype=np.float32)
+        for i, face in enumerate(faces):
+            if len(face.shape) == 3:
+                face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+            batch[i, :, :, 0] = cv2.resize(face, FACE_EMOTION_INPUT_SIZE)
+        batch /= 255.0
+        
+        predictions = self._get_face_emotion_model().predict(batch, verbose=0)
+        
+        results = []
+        for prediction in predictions:
+            total = float(prediction.sum()) or 1.0
+            results.append({
+                label: float(prediction[i]) / total
+                for i, label in enumerate(FACE_EMOTION_LABELS)
+            })
+        return results
+    
+    def classify_face_emotions(self, faces):
+        """
+        Get emotion confidence scores for face crops, skipping face detection.
+        
+        Args:
+            faces (list): Face crops, e.g. from extract_face_roi
+            
+        Returns:
+            list: Emotion confidence dictionaries, one per face
+        """
+        if not faces:
             return []
+        
+        try:
+            return self._classify_faces(faces)
+            
+        except Exception as e:
+            print(f"Error in face emotion classification: {e}")
+            return [{'neutral': 1.0} for _ in faces]
     
-    def detect_face_emotion(self, image):
+    def get_face_emotion_confidences(self, images, session_ids=None):
+        """
+        Get emotion confidence scores for a batch of images.
+        Face detection and emotion classification each run once for the whole batch.
+        
+        Args:
+            images (list): Input images
+            session_ids (list, optional): Session identifier per image, enables face tracking
+            
+        Returns:
+            list: Emotion confidence dictionaries, one per image
+        """
+        if not images:
+            return []
+        
+        try:
+            faces = self.detect_faces_batch(images, session_ids=session_ids)
+            crops = [
+                self.extract_face_roi(image, image_faces)
+                for image, image_faces in zip(images, faces)
+            ]
+            return self._classify_faces(crops)
+            
+        except Exception as e:
+            print(f"Error in batched face emotion detection: {e}")
+            return [{'neutral': 1.0} for _ in images]
+    
+    def detect_face_emotions(self, images, session_ids=None):
+        """
+        Detect the dominant facial emotion for a batch of images.
+        
+        Args:
+            images (list): Input images
+            session_ids (list, optional): Session identifier per image, enables face tracking
+            
+        Returns:
+            list: Detected emotion per image
+        """
+        return [
+            max(confidences, key=confidences.get)
+            for confidences in self.get_face_emotion_confidences(images, session_ids)
+        ]
+    
+    def detect_face_emotion(self, image, session_id=None):
         """
         Detect emotion from facial expression in an image.
+        The SSD face detector runs once and only the highest-confidence face crop is classified.
         
         Args:
             image (numpy.ndarray): Input image
+            session_id (str, optional): Video session the frame belongs to, enables face tracking
             
         Returns:
-            str: Detected emotion or 'no_face' if no face detected
+            str: Detected emotion
+        """
+        return self.detect_face_emotions([image], [session_id])[0]
+    
+    def analyze_face(self, image, session_id=None):
+        """
+        Analyze the facial emotion in an image.
+        
+        Args:
+            image (numpy.ndarray): Input image
+            session_id (str, optional): Video session the frame belongs to, enables face tracking
+            
+        Returns:
+            EmotionAnalysis: Dominant emotion and probability distribution
+        """
+        return EmotionAnalysis(self.get_face_emotion_confidences([image], [session_id])[0], 'face')
+    
+    @staticmethod
+    def normalize_text(text):
         """
+        Normalize text for cache lookups by folding case and whitespace.
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            str: Normalized text
+        """
+        return ' '.join(text.casefold().split())
+    
+    def analyze_texts(self, texts, max_batch_size=16):
+        """
+        Analyze emotions for several texts using batched EmoRoBERTa forward passes.
+        The label, softmax distribution and top-k all come from the same pass.
+        
+        Results are cached by normalized text; only texts missing from the cache
+        (each distinct one once) reach the model.
+        
+        Args:
+            texts (list): Input texts
+            max_batch_size (int): Maximum number of texts per forward pass
+            
+        Returns:
+            list: EmotionAnalysis per text, in input order
+        """
+        if not texts:
+            return []
+        
+        if not self._text_model_available():
+            return [EmotionAnalysis.neutral('text') for _ in texts]
+        
+        # Results depend on the token cap and windowing mode as well as the text
+        key_prefix = f"{self.text_max_tokens}|{int(self.text_windowing)}|"
+        keys = [key_prefix + self.normalize_text(text) for text in texts]
+        scores_by_key = {}
+        if self.text_cache is not None:
+            for key in set(keys):
+                cached = self.text_cache.get(key)
+                if cached is not None:
+                    scores_by_key[key] = cached
+        
+        # Run the model once per distinct uncached text
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key not in scores_by_key and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            missing_keys = list(missing)
+            for key, scores in zip(missing_keys, self._run_text_model([missing[k] for k in missing_keys], max_batch_size)):
+                if scores is None:
+                    continue
+                scores_by_key[key] = scores
+                if self.text_cache is not None:
+                    self.text_cache.set(key, scores)
+        
+        return [
+            EmotionAnalysis(scores_by_key[key], 'text') if key in scores_by_key
+            else EmotionAnalysis.neutral('text')
+            for key in keys
+        ]
+    
+    def _split_text_windows(self, text):
+        """
+        Split a long message into sentence windows that fit the token cap.
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            list: (window text, token count) pairs; a single pair when no split is needed
+        """
+        # Room for the <s> and </s> special tokens
+        budget = self.text_max_tokens - 2
+        
+        # Byte-level BPE never produces more tokens than UTF-8 bytes
+        if not self.text_windowing or len(text.encode('utf-8')) <= budget:
+            return [(text, 1)]
+        
+        sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+        if not sentences:
+            return [(text, 1)]
+        
+        lengths = [
+            len(ids) for ids in
+            self.text_tokenizer(sentences, add_special_tokens=False)['input_ids']
+        ]
+        if sum(lengths) <= budget:
+            return [(text, 1)]
+        
+        # Greedily pack consecutive sentences; overlong sentences are truncated later
+        windows = []
+        current, current_length = [], 0
+        for sentence, length in zip(sentences, lengths):
+            if current and current_length + length > budget:
+                windows.append((' '.join(current), current_length))
+                current, current_length = [], 0
+            current.append(sentence)
+            current_length += length
+        if current:
+            windows.append((' '.join(current), current_length))
+        
+        # Bound worst-case latency with evenly spaced windows across the message
+        if len(windows) > self.text_max_windows:
+            positions = np.linspace(0, len(windows) - 1, self.text_max_windows).round().astype(int)
+            windows = [windows[i] for i in sorted(set(positions.tolist()))]
+        
+        return [(window, min(length, budget)) for window, length in windows]
+    
+    def _run_text_model(self, texts, max_batch_size=16):
+        """
+        Run EmoRoBERTa over texts in length-sorted, dynamically padded batches.
+        
+        Texts are grouped by length and each group is padded only to its longest
+        member, so short messages do not pay for long ones. With windowing enabled,
+        long texts are split into sentence windows that are classified in the same
+        batches and averaged, weighted by their token counts.
+        
+        Args:
+            texts (list): Input texts
+            max_batch_size (int): Maximum number of sequences per forward pass
+            
+        Returns:
+            list: Emotion probability dictionary per text (None where inference failed)
+        """
+        results = [None] * len(texts)
         try:
-            # Convert BGR to RGB for DeepFace
-            if len(image.shape) == 3:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            else:
-                image_rgb = image
+            segments, owners, weights = [], [], []
+            for index, text in enumerate(texts):
+                for window, weight in self._split_text_windows(text):
+                    segments.append(window)
+                    owners.append(index)
+                    weights.append(weight)
             
-            # Use DeepFace for emotion analysis
-            result = DeepFace.analyze(
-                image_rgb, 
-                actions=['emotion'], 
-                enforce_detection=False
-            )
+            # Sort by length so each batch needs as little padding as possible
+            order = sorted(range(len(segments)), key=lambda i: len(segments[i]))
             
-            # Handle different result formats
-            if isinstance(result, list):
-                emotion = result[0]['emotion']
-            else:
-                emotion = result['emotion']
+            totals = np.zeros((len(texts), len(self.emotion_labels)))
+            weight_sums = np.zeros(len(texts))
+            for start in range(0, len(order), max_batch_size):
+                indices = order[start:start + max_batch_size]
+                
+                # Dynamic padding to the longest sequence in this batch
+                probabilities = self._predict_text_probabilities([segments[i] for i in indices])
+                
+                for i, row in zip(indices, probabilities):
+                    row = np.asarray(row[:len(self.emotion_labels)])
+                    totals[owners[i], :len(row)] += weights[i] * row
+                    weight_sums[owners[i]] += weights[i]
             
-            # Get dominant emotion
-            dominant_emotion = max(emotion, key=emotion.get)
+            for index in range(len(texts)):
+                if weight_sums[index] > 0:
+                    averaged = totals[index] / weight_sums[index]
+                    results[index] = {
+                        emotion: float(averaged[j])
+                        for j, emotion in enumerate(self.emotion_labels)
+                    }
             
-            return dominant_emotion
+            return results
             
         except Exception as e:
-            print(f"Error in face emotion detection: {e}")
-            return 'neutral'
+            print(f"Error in batched text emotion detection: {e}")
+            return results
+    
+    def analyze_text(self, text):
+        """
+        Analyze the emotion of a single text with one forward pass.
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            EmotionAnalysis: Dominant emotion and probability distribution
+        """
+        return self.analyze_texts([text])[0]
     
     def detect_text_emotion(self, text):
         """
@@ -167,33 +974,20 @@ class EmotionDetector:
         Returns:
             str: Detected emotion
         """
-        if self.text_tokenizer is None or self.text_model is None:
-            return 'neutral'
+        return self.analyze_text(text).label
+    
+    def detect_text_emotions(self, texts, max_batch_size=16):
+        """
+        Detect emotions for several texts using batched EmoRoBERTa forward passes.
         
-        try:
-            # Tokenize input text
-            inputs = self.text_tokenizer(
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=512
-            )
-            
-            # Get model predictions
-            with torch.no_grad():
-                outputs = self.text_model(**inputs)
-                logits = outputs.logits
-                emotion_id = int(torch.argmax(logits))
+        Args:
+            texts (list): Input texts
+            max_batch_size (int): Maximum number of texts per forward pass
             
-            # Return corresponding emotion label
-            if self.emotion_labels and 0 <= emotion_id < len(self.emotion_labels):
-                return self.emotion_labels[emotion_id]
-            else:
-                return 'neutral'
-                
-        except Exception as e:
-            print(f"Error in text emotion detection: {e}")
-            return 'neutral'
+        Returns:
+            list: Detected emotion per text, in input order
+        """
+        return [analysis.label for analysis in self.analyze_texts(texts, max_batch_size)]
     
     def get_emotion_confidence(self, text):
         """
@@ -205,34 +999,7 @@ class EmotionDetector:
         Returns:
             dict: Emotion confidence scores
         """
-        if self.text_tokenizer is None or self.text_model is None:
-            return {'neutral': 1.0}
-        
-        try:
-            inputs = self.text_tokenizer(
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=512
-            )
-            
-            with torch.no_grad():
-                outputs = self.text_model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=-1)
-            
-            # Create emotion confidence dictionary
-            emotion_confidences = {}
-            if self.emotion_labels:
-                for i, emotion in enumerate(self.emotion_labels):
-                    if i < len(probabilities[0]):
-                        emotion_confidences[emotion] = float(probabilities[0][i])
-            
-            return emotion_confidences
-            
-        except Exception as e:
-            print(f"Error getting emotion confidence: {e}")
-            return {'neutral': 1.0}
+        return self.analyze_text(text).scores
     
     def detect_combined_emotion(self, image, text):
         """
@@ -245,20 +1012,22 @@ class EmotionDetector:
         Returns:
             dict: Combined emotion analysis
         """
-        face_emotion = self.detect_face_emotion(image)
-        text_emotion = self.detect_text_emotion(text)
+        face_analysis = self.analyze_face(image)
+        text_analysis = self.analyze_text(text)
         
         # Simple combination logic - can be enhanced with more sophisticated methods
-        combined_emotion = self._combine_emotions(face_emotion, text_emotion)
+        combined_emotion = self._combine_emotions(face_analysis.label, text_analysis.label)
         
         return {
-            'face_emotion': face_emotion,
-            'text_emotion': text_emotion,
+            'face_emotion': face_analysis.label,
+            'text_emotion': text_analysis.label,
             'combined_emotion': combined_emotion,
             'confidence': {
-                'face': 0.8,  # Placeholder - implement actual confidence calculation
-                'text': 0.7   # Placeholder
-            }
+                'face': face_analysis.confidence,
+                'text': text_analysis.confidence
+            },
+            'face_analysis': face_analysis.to_dict(),
+            'text_analysis': text_analysis.to_dict()
         }
     
     def _combine_emotions(self, face_emotion, text_emotion):
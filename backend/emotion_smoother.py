@@ -0,0 +1,160 @@
+"""
+Emotion Smoothing Module
+Per-session change detection and temporal smoothing for facial emotions.
+Frames that barely differ from the last analyzed frame of a session reuse
+the cached result instead of running the model again, and fresh results
+are blended into an exponentially smoothed probability vector.
+"""
+
+import cv2
+import threading
+from collections import OrderedDict
+
+class EmotionSmoother:
+    """
+    Change gate and exponential smoothing for one video session.
+    """
+
+    def __init__(self, change_threshold=3.0, smoothing=0.6, thumbnail_size=(32, 32), max_skipped_frames=15):
+        """
+        Initialize the smoother.
+
+        Args:
+            change_threshold (float): Mean absolute gray-level difference (0-255) below which a frame is unchanged
+            smoothing (float): Weight of the newest result in the moving average (1.0 = no smoothing)
+            thumbnail_size (tuple): Size of the grayscale thumbnail used for comparison
+            max_skipped_frames (int): Force a fresh analysis after this many consecutive skipped frames
+        """
+        self.change_threshold = change_threshold
+        self.smoothing = smoothing
+        self.thumbnail_size = thumbnail_size
+        self.max_skipped_frames = max_skipped_frames
+
+        self.smoothed = None
+        self.skipped_frames = 0
+        self._last_thumbnail = None
+        self._lock = threading.Lock()
+
+    def thumbnail(self, frame):
+        """
+        Create the downscaled grayscale thumbnail used for change detection.
+
+        Args:
+            frame (numpy.ndarray): Input frame
+
+        Returns:
+            numpy.ndarray: Grayscale thumbnail
+        """
+        if len(frame.shape) == 3:
+            small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+
+    def is_unchanged(self, thumbnail):
+        """
+        Check whether a frame can reuse the cached result.
+        Counts the frame as skipped when it does.
+
+        Args:
+            thumbnail (numpy.ndarray): Thumbnail returned by thumbnail()
+
+        Returns:
+            bool: True if the cached result should be returned
+        """
+        with self._lock:
+            if self.smoothed is None or self._last_thumbnail is None:
+                return False
+            if self.skipped_frames >= self.max_skipped_frames:
+                return False
+
+            difference = cv2.norm(thumbnail, self._last_thumbnail, cv2.NORM_L1) / thumbnail.size
+            if difference >= self.change_threshold:
+                return False
+
+            self.skipped_frames += 1
+            return True
+
+    def update(self, thumbnail, confidences):
+        """
+        Blend a fresh result into the smoothed probabilities.
+
+        Args:
+            thumbnail (numpy.ndarray): Thumbnail of the analyzed frame
+            confidences (dict): Emotion probabilities for the frame
+
+        Returns:
+            dict: Smoothed emotion probabilities
+        """
+        with self._lock:
+            if self.smoothed is None:
+                self.smoothed = dict(confidences)
+            else:
+                labels = set(self.smoothed) | set(confidences)
+                self.smoothed = {
+                    label: self.smoothing * confidences.get(label, 0.0)
+                    + (1.0 - self.smoothing) * self.smoothed.get(label, 0.0)
+                    for label in labels
+                }
+
+            self._last_thumbnail = thumbnail
+            self.skipped_frames = 0
+            return dict(self.smoothed)
+
+    def get_smoothed(self):
+        """
+        Get the current smoothed probabilities.
+
+        Returns:
+            dict: Smoothed emotion probabilities, or None before the first update
+        """
+        with self._lock:
+            return dict(self.smoothed) if self.smoothed is not None else None
+
+class EmotionSmootherPool:
+    """
+    Bounded collection of per-session emotion smoothers.
+    """
+
+    def __init__(self, max_sessions=256, **smoother_options):
+        """
+        Initialize the pool.
+
+        Args:
+            max_sessions (int): Maximum number of sessions kept; least recently used are dropped
+            **smoother_options: Options passed to each EmotionSmoother
+        """
+        self.max_sessions = max_sessions
+        self.smoother_options = smoother_options
+        self._smoothers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """
+        Get the smoother for a session, creating it if needed.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            EmotionSmoother: Smoother for the session
+        """
+        with self._lock:
+            smoother = self._smoothers.get(session_id)
+            if smoother is None:
+                smoother = EmotionSmoother(**self.smoother_options)
+                self._smoothers[session_id] = smoother
+                while len(self._smoothers) > self.max_sessions:
+                    self._smoothers.popitem(last=False)
+            else:
+                self._smoothers.move_to_end(session_id)
+            return smoother
+
+    def remove(self, session_id):
+        """
+        Drop the smoother of a session.
+
+        Args:
+            session_id (str): Session identifier
+        """
+        with self._lock:
+            self._smoothers.pop(session_id, None)
@@ -0,0 +1,189 @@
+"""
+Face Tracking Module
+Follows a face across consecutive video frames so the DNN face detector
+only has to run every few frames.
+The face is located with normalized template matching against the template
+taken at the last detection: first in a small, downscaled search window
+around its previous position, then refined at full resolution.
+"""
+
+import math
+import cv2
+import threading
+
+class FaceTracker:
+    """
+    Tracks the primary face of a single video session.
+    """
+
+    def __init__(self, redetect_interval=10, min_match_score=0.6, search_margin=0.25, template_size=32):
+        """
+        Initialize the face tracker.
+
+        Args:
+            redetect_interval (int): Run the DNN detector at least every N frames
+            min_match_score (float): Minimum normalized correlation to accept a tracked box
+            search_margin (float): Search window padding as a fraction of the box size
+            template_size (int): Longest side of the downscaled template in pixels
+        """
+        self.redetect_interval = max(1, int(redetect_interval))
+        self.min_match_score = min_match_score
+        self.search_margin = search_margin
+        self.template_size = template_size
+
+        self.bbox = None
+        self.detection_confidence = 0.0
+        self.match_score = 0.0
+        self.frames_since_detection = 0
+
+        self._template = None
+        self._full_template = None
+        self._scale = 1.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_gray(image):
+        """Convert an image to grayscale if needed"""
+        if len(image.shape) == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def _set_template(self, gray, bbox):
+        """Store full-resolution and downscaled templates of the face at the given box"""
+        x, y, x2, y2 = bbox
+        w, h = x2 - x, y2 - y
+        self._scale = min(1.0, self.template_size / float(max(w, h)))
+        self._full_template = gray[y:y2, x:x2].copy()
+        self._template = cv2.resize(
+            self._full_template, None,
+            fx=self._scale, fy=self._scale,
+            interpolation=cv2.INTER_AREA
+        )
+        self.bbox = bbox
+
+    def reset(self):
+        """Forget the tracked face so the next frame runs the detector"""
+        with self._lock:
+            self.bbox = None
+            self._template = None
+            self._full_template = None
+            self.match_score = 0.0
+            self.frames_since_detection = 0
+
+    def track(self, image):
+        """
+        Try to locate the face without running the DNN detector.
+
+        Args:
+            image (numpy.ndarray): Current frame
+
+        Returns:
+            list: Tracked face in detect_faces format, or None if detection is required
+        """
+        with self._lock:
+            if self.bbox is None or self.frames_since_detection >= self.redetect_interval:
+                return None
+
+            gray = self._to_gray(image)
+            height, width = gray.shape[:2]
+            x, y, x2, y2 = self.bbox
+            w, h = x2 - x, y2 - y
+
+            if x2 > width or y2 > height:
+                # Frame size changed since the last detection
+                self.bbox = None
+                return None
+
+            # Search window around the previous position
+            margin_x = int(w * self.search_margin)
+            margin_y = int(h * self.search_margin)
+            sx, sy = max(0, x - margin_x), max(0, y - margin_y)
+            ex, ey = min(width, x2 + margin_x), min(height, y2 + margin_y)
+
+            search = cv2.resize(
+                gray[sy:ey, sx:ex], None,
+                fx=self._scale, fy=self._scale,
+                interpolation=cv2.INTER_AREA
+            )
+            th, tw = self._template.shape[:2]
+            if search.shape[0] < th or search.shape[1] < tw:
+                self.bbox = None
+                return None
+
+            result = cv2.matchTemplate(search, self._template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(result)
+
+            if score < self.min_match_score:
+                # Tracking confidence dropped - fall back to the detector
+                self.bbox = None
+                self.match_score = score
+                return None
+
+            nx = min(width - w, sx + int(round(location[0] / self._scale)))
+            ny = min(height - h, sy + int(round(location[1] / self._scale)))
+            if self._scale < 1.0:
+                nx, ny = self._refine(gray, nx, ny)
+
+            # The template stays the one from the last detection, so match
+            # errors of earlier frames do not carry over
+            self.bbox = (nx, ny, nx + w, ny + h)
+            self.match_score = score
+            self.frames_since_detection += 1
+
+            return [{
+                'bbox': self.bbox,
+                'confidence': self.detection_confidence * score,
+                'tracked': True
+            }]
+
+    def _refine(self, gray, x, y):
+        """
+        Refine a match found at template scale with a full-resolution match
+        within one template pixel of it.
+
+        Args:
+            gray (numpy.ndarray): Current frame in grayscale
+            x (int): Coarse left edge of the face
+            y (int): Coarse top edge of the face
+
+        Returns:
+            tuple: Refined (x, y) of the face
+        """
+        height, width = gray.shape[:2]
+        th, tw = self._full_template.shape[:2]
+        radius = int(math.ceil(1.0 / self._scale))
+        sx, sy = max(0, x - radius), max(0, y - radius)
+        ex, ey = min(width - tw, x + radius), min(height - th, y + radius)
+
+        result = cv2.matchTemplate(gray[sy:ey + th, sx:ex + tw], self._full_template, cv2.TM_CCOEFF_NORMED)
+        _, _, _, location = cv2.minMaxLoc(result)
+        return sx + location[0], sy + location[1]
+
+    def update(self, image, faces):
+        """
+        Reinitialize the tracker from a fresh DNN detection.
+
+        Args:
+            image (numpy.ndarray): Frame the detection ran on
+            faces (list): Faces returned by the detector
+        """
+        with self._lock:
+            self.frames_since_detection = 0
+
+            best_face = max(faces, key=lambda face: face['confidence']) if faces else None
+            if best_face is None:
+                self.bbox = None
+                self._template = None
+                self._full_template = None
+                return
+
+            x, y, x2, y2 = best_face['bbox']
+            if x2 - x < 2 or y2 - y < 2:
+                self.bbox = None
+                self._template = None
+                self._full_template = None
+                return
+
+            self._set_template(self._to_gray(image), (x, y, x2, y2))
+            self.detection_confidence = float(best_face['confidence'])
+            self.match_score = 1.0
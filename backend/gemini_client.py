@@ -4,9 +4,84 @@ Handles communication with Google's Gemini API for empathetic therapy responses.
 """
 
 import os
+import hashlib
 import requests
 import json
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, Optional
+from lru_cache import LRUCache
+from circuit_breaker import CircuitBreaker
+
+DEFAULT_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+THERAPY_PROMPT_TEMPLATE = """You are an empathetic virtual therapist. Based on the user's emotional state and message, provide a supportive, understanding response.
+
+{conversation_context}User's facial emotion: {face_emotion}
+User's text emotion: {text_emotion}
+User's message: "{user_message}"
+
+Context: {emotion_context}
+
+Guidelines:
+- Be warm, empathetic, and non-judgmental
+- Acknowledge their emotional state
+- Ask gentle, open-ended questions to understand their feelings better
+- Provide supportive guidance without being prescriptive
+- Keep responses concise (2-3 sentences) but meaningful
+- Use "I" statements to show understanding
+- Avoid clinical language - be conversational and human
+
+Respond as a caring therapist would:"""
+
+# Therapeutic guidance per detected emotion
+EMOTION_GUIDANCE = {
+    'sad': "The user appears to be feeling sad. Show empathy, validate their feelings, and gently explore what's causing their sadness. Offer comfort and hope.",
+    'angry': "The user seems angry or frustrated. Acknowledge their feelings, help them identify the source of their anger, and guide them toward calming techniques.",
+    'fear': "The user appears anxious or fearful. Provide reassurance, help them feel safe, and gently explore what's causing their anxiety.",
+    'happy': "The user seems to be in a positive mood. Celebrate with them, encourage them to share what's making them happy, and reinforce positive feelings.",
+    'surprise': "The user seems surprised. Help them process whatever unexpected event or information they're dealing with.",
+    'disgust': "The user appears to be feeling disgusted or repulsed. Validate their feelings and help them process what's causing this reaction.",
+    'neutral': "The user's emotional state is neutral. Be warm and inviting, ask how they're feeling, and create a safe space for them to share."
+}
+
+# Responses used when the API is unavailable
+FALLBACK_RESPONSES = {
+    'sad': "I can sense that you're going through a difficult time. I'm here to listen and support you. What's been weighing on your mind?",
+    'angry': "I understand you're feeling frustrated or angry. That's completely valid. Can you help me understand what's causing these feelings?",
+    'fear': "I can see you might be feeling anxious or worried. You're safe here, and I want to help you work through whatever is troubling you.",
+    'happy': "It's wonderful to see you in good spirits! I'd love to hear more about what's bringing you joy right now.",
+    'neutral': "Hello! I'm here to listen and support you. How are you feeling today? What would you like to talk about?"
+}
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 200,
+}
+
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH", 
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
 
 class GeminiClient:
     """
@@ -14,23 +89,90 @@ class GeminiClient:
     Generates empathetic responses based on user emotions and messages.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None,
+                 model: Optional[str] = None, timeout: Optional[float] = None,
+                 pool_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 cache_size: Optional[int] = None, cache_ttl: Optional[float] = None,
+                 latency_budget: Optional[float] = None, breaker: Optional[CircuitBreaker] = None):
         """
         Initialize Gemini client.
         
         Args:
             api_key (str, optional): Gemini API key. If None, will try to get from environment.
+            api_base (str, optional): API root, e.g. a local stub server (GEMINI_BASE_URL)
+            model (str, optional): Model name (GEMINI_MODEL)
+            timeout (float, optional): Request timeout in seconds (GEMINI_TIMEOUT)
+            pool_size (int, optional): Keep-alive connections kept open (GEMINI_POOL_SIZE)
+            max_workers (int, optional): Threads serving get_response_async (GEMINI_MAX_WORKERS)
+            cache_size (int, optional): Cached responses, 0 disables the cache (GEMINI_CACHE_SIZE)
+            cache_ttl (float, optional): Seconds a cached response stays valid (GEMINI_CACHE_TTL)
+            latency_budget (float, optional): Seconds to wait before answering with a fallback while
+                the request keeps running in the background, 0 waits for the full timeout
+                (GEMINI_LATENCY_BUDGET)
+            breaker (CircuitBreaker, optional): Breaker guarding the API (configured from GEMINI_BREAKER_*)
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable.")
         
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+        self.api_base = (api_base or os.getenv('GEMINI_BASE_URL', DEFAULT_API_BASE)).rstrip('/')
+        self.model = model or os.getenv('GEMINI_MODEL', DEFAULT_MODEL)
+        self.timeout = timeout or float(os.getenv('GEMINI_TIMEOUT', '30'))
+        self.base_url = f"{self.api_base}/models/{self.model}:generateContent"
+        self.stream_url = f"{self.api_base}/models/{self.model}:streamGenerateContent"
         self.headers = {
             "Content-Type": "application/json"
         }
+        
+        # One keep-alive session so consecutive messages reuse the TLS connection
+        pool_size = pool_size or int(os.getenv('GEMINI_POOL_SIZE', '10'))
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('GEMINI_MAX_WORKERS', '8')),
+            thread_name_prefix='gemini'
+        )
+        # Separate pool for the HTTP calls so hedged waits never starve it
+        self._request_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='gemini-request')
+        
+        self.latency_budget = (
+            float(os.getenv('GEMINI_LATENCY_BUDGET', '8')) if latency_budget is None else latency_budget
+        ) or None
+        self.breaker = breaker or CircuitBreaker(
+            failure_rate_threshold=float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', '0.5')),
+            window_size=int(os.getenv('GEMINI_BREAKER_WINDOW', '20')),
+            min_calls=int(os.getenv('GEMINI_BREAKER_MIN_CALLS', '5')),
+            # Calls over the latency budget count as failures unless configured otherwise
+            slow_call_seconds=float(os.getenv('GEMINI_SLOW_CALL_SECONDS', '0')) or self.latency_budget,
+            open_duration=float(os.getenv('GEMINI_BREAKER_OPEN_SECONDS', '30')),
+            name='gemini'
+        )
+        self.hedged_responses = 0
+        self.rejected_responses = 0
+        self.prompts_built = 0
+        self.prompt_build_time = 0.0
+        self.max_prompt_chars = 0
+        self._stats_lock = threading.Lock()
+        
+        # Settings shared by every request, built once
+        self._request_template = {
+            "generationConfig": GENERATION_CONFIG,
+            "safetySettings": SAFETY_SETTINGS
+        }
+        
+        # Responses keyed by emotions, normalized message and recent history
+        cache_size = int(os.getenv('GEMINI_CACHE_SIZE', '256')) if cache_size is None else cache_size
+        cache_ttl = float(os.getenv('GEMINI_CACHE_TTL', '600')) if cache_ttl is None else cache_ttl
+        self.response_cache = None
+        if cache_size:
+            self.response_cache = LRUCache(max_size=cache_size, ttl=cache_ttl or None, name='gemini_responses')
     
-    def _create_therapy_prompt(self, face_emotion: str, text_emotion: str, user_message: str) -> str:
+    def _create_therapy_prompt(self, face_emotion: str, text_emotion: str, user_message: str,
+                               history: Optional[Dict] = None) -> str:
         """
         Create a therapeutic prompt for Gemini based on user's emotional state.
         
@@ -38,6 +180,7 @@ class GeminiClient:
             face_emotion (str): Detected facial emotion
             text_emotion (str): Detected text emotion
             user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
             
         Returns:
             str: Formatted prompt for Gemini
@@ -45,27 +188,38 @@ class GeminiClient:
         # Create empathetic context based on emotions
         emotion_context = self._get_emotion_context(face_emotion, text_emotion)
         
-        prompt = f"""You are an empathetic virtual therapist. Based on the user's emotional state and message, provide a supportive, understanding response.
-
-User's facial emotion: {face_emotion}
-User's text emotion: {text_emotion}
-User's message: "{user_message}"
-
-Context: {emotion_context}
-
-Guidelines:
-- Be warm, empathetic, and non-judgmental
-- Acknowledge their emotional state
-- Ask gentle, open-ended questions to understand their feelings better
-- Provide supportive guidance without being prescriptive
-- Keep responses concise (2-3 sentences) but meaningful
-- Use "I" statements to show understanding
-- Avoid clinical language - be conversational and human
-
-Respond as a caring therapist would:"""
+        prompt = THERAPY_PROMPT_TEMPLATE.format(
+            conversation_context=self._format_history(history),
+            face_emotion=face_emotion,
+            text_emotion=text_emotion,
+            user_message=user_message,
+            emotion_context=emotion_context
+        )
 
         return prompt
     
+    @staticmethod
+    def _format_history(history: Optional[Dict]) -> str:
+        """
+        Render the conversation context section of the prompt.
+        
+        Args:
+            history (dict, optional): 'summary' and 'turns' from ConversationMemory.get_context()
+            
+        Returns:
+            str: Prompt section, empty for a new conversation
+        """
+        if not history or not (history.get('summary') or history.get('turns')):
+            return ''
+        
+        lines = ["Conversation so far:"]
+        if history.get('summary'):
+            lines.append(f"Summary: {history['summary']}")
+        for turn in history.get('turns', []):
+            lines.append(f"User ({turn['user_emotion']}): {turn['user_message']}")
+            lines.append(f"Therapist: {turn['ai_response']}")
+        return '\n'.join(lines) + '\n\n'
+    
     def _get_emotion_context(self, face_emotion: str, text_emotion: str) -> str:
         """
         Generate contextual guidance based on detected emotions.
@@ -77,22 +231,64 @@ Respond as a caring therapist would:"""
         Returns:
             str: Contextual guidance for the AI
         """
-        # Map emotions to therapeutic approaches
-        emotion_guidance = {
-            'sad': "The user appears to be feeling sad. Show empathy, validate their feelings, and gently explore what's causing their sadness. Offer comfort and hope.",
-            'angry': "The user seems angry or frustrated. Acknowledge their feelings, help them identify the source of their anger, and guide them toward calming techniques.",
-            'fear': "The user appears anxious or fearful. Provide reassurance, help them feel safe, and gently explore what's causing their anxiety.",
-            'happy': "The user seems to be in a positive mood. Celebrate with them, encourage them to share what's making them happy, and reinforce positive feelings.",
-            'surprise': "The user seems surprised. Help them process whatever unexpected event or information they're dealing with.",
-            'disgust': "The user appears to be feeling disgusted or repulsed. Validate their feelings and help them process what's causing this reaction.",
-            'neutral': "The user's emotional state is neutral. Be warm and inviting, ask how they're feeling, and create a safe space for them to share."
-        }
-        
         # Use the more specific emotion (face or text) for guidance
         primary_emotion = face_emotion if face_emotion != 'neutral' else text_emotion
-        return emotion_guidance.get(primary_emotion, emotion_guidance['neutral'])
+        return EMOTION_GUIDANCE.get(primary_emotion, EMOTION_GUIDANCE['neutral'])
     
-    def get_response(self, face_emotion: str, text_emotion: str, user_message: str) -> str:
+    def _build_request(self, face_emotion: str, text_emotion: str, user_message: str,
+                       history: Optional[Dict] = None) -> Dict:
+        """
+        Build the generateContent request body.
+        
+        Args:
+            face_emotion (str): Detected facial emotion
+            text_emotion (str): Detected text emotion
+            user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
+            
+        Returns:
+            dict: Request JSON
+        """
+        start = time.perf_counter()
+        prompt = self._create_therapy_prompt(face_emotion, text_emotion, user_message, history)
+        with self._stats_lock:
+            self.prompts_built += 1
+            self.prompt_build_time += time.perf_counter() - start
+            self.max_prompt_chars = max(self.max_prompt_chars, len(prompt))
+        
+        # Static settings come from the template built once in __init__
+        request_data = dict(self._request_template)
+        request_data["contents"] = [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+        return request_data
+    
+    @staticmethod
+    def _cache_key(face_emotion: str, text_emotion: str, user_message: str,
+                   history: Optional[Dict] = None) -> str:
+        """
+        Build the response cache key.
+        
+        Args:
+            face_emotion (str): Detected facial emotion
+            text_emotion (str): Detected text emotion
+            user_message (str): User's message
+            history (dict, optional): Conversation context the response depends on
+            
+        Returns:
+            str: Cache key
+        """
+        normalized = ' '.join(user_message.casefold().split())
+        history_hash = ''
+        if history:
+            encoded = json.dumps(history, sort_keys=True, default=str).encode()
+            history_hash = hashlib.sha1(encoded).hexdigest()
+        return f"{face_emotion}|{text_emotion}|{history_hash}|{normalized}"
+    
+    def get_response(self, face_emotion: str, text_emotion: str, user_message: str,
+                     history: Optional[Dict] = None) -> str:
         """
         Get an empathetic response from Gemini based on user's emotional state.
         
@@ -100,49 +296,82 @@ Respond as a caring therapist would:"""
             face_emotion (str): Detected facial emotion
             text_emotion (str): Detected text emotion  
             user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
             
         Returns:
             str: Gemini's empathetic response
         """
+        cache_key = self._cache_key(face_emotion, text_emotion, user_message, history)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if not self.breaker.allow_request():
+            # The API is failing or slow; answer right away
+            self._count('rejected_responses')
+            return self._get_fallback_response(face_emotion, text_emotion)
+        
+        future = self._request_executor.submit(
+            self._guarded_request, face_emotion, text_emotion, user_message, history, cache_key
+        )
         try:
-            prompt = self._create_therapy_prompt(face_emotion, text_emotion, user_message)
+            response_text = future.result(timeout=self.latency_budget)
+        except FutureTimeoutError:
+            # Over budget: answer with the fallback; the request still completes and fills the cache
+            self._count('hedged_responses')
+            return self._get_fallback_response(face_emotion, text_emotion)
+        
+        if response_text is None:
+            return self._get_fallback_response(face_emotion, text_emotion)
+        return response_text
+    
+    def _guarded_request(self, face_emotion: str, text_emotion: str, user_message: str,
+                         history: Optional[Dict], cache_key: str) -> Optional[str]:
+        """
+        Call the API, record the outcome with the circuit breaker and cache the response.
+        
+        Returns:
+            str: Response text, or None if the request failed
+        """
+        start = time.monotonic()
+        response_text = self._request_response(face_emotion, text_emotion, user_message, history)
+        latency = time.monotonic() - start
+        
+        if response_text is None:
+            self.breaker.record_failure(latency)
+            return None
+        
+        self.breaker.record_success(latency)
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, response_text)
+        return response_text
+    
+    def _count(self, counter: str):
+        """Increment a response counter"""
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def _request_response(self, face_emotion: str, text_emotion: str, user_message: str,
+                          history: Optional[Dict] = None) -> Optional[str]:
+        """
+        Call generateContent once.
+        
+        Args:
+            face_emotion (str): Detected facial emotion
+            text_emotion (str): Detected text emotion
+            user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
             
-            # Prepare request data for Gemini API
-            data = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 200,
-                },
-                "safetySettings": [
-                    {
-                        "category": "HARM_CATEGORY_HARASSMENT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_HATE_SPEECH", 
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    }
-                ]
-            }
+        Returns:
+            str: Response text, or None if the request failed
+        """
+        try:
+            data = self._build_request(face_emotion, text_emotion, user_message, history)
             
-            # Make API request
+            # Make API request over the pooled session
             url = f"{self.base_url}?key={self.api_key}"
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            response = self.session.post(url, json=data, timeout=self.timeout)
             
             if response.status_code == 200:
                 result = response.json()
@@ -153,17 +382,148 @@ Respond as a caring therapist would:"""
                     if 'content' in candidate and 'parts' in candidate['content']:
                         return candidate['content']['parts'][0]['text']
                 
-                return "I understand how you're feeling. Can you tell me more about what's on your mind?"
+                # No text (e.g. a blocked prompt): a failure, so it is neither cached nor counted as healthy
+                print(f"Gemini API returned no response text: {result.get('promptFeedback', result)}")
+                return None
             else:
                 print(f"Gemini API Error: {response.status_code} - {response.text}")
-                return self._get_fallback_response(face_emotion, text_emotion)
+                return None
                 
         except requests.exceptions.Timeout:
             print("Gemini API request timed out")
-            return self._get_fallback_response(face_emotion, text_emotion)
+            return None
         except Exception as e:
             print(f"Error calling Gemini API: {e}")
-            return self._get_fallback_response(face_emotion, text_emotion)
+            return None
+    
+    def stream_response(self, face_emotion: str, text_emotion: str, user_message: str,
+                        history: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Stream an empathetic response as text chunks while Gemini generates it.
+        Uses streamGenerateContent with server-sent events.
+        
+        Args:
+            face_emotion (str): Detected facial emotion
+            text_emotion (str): Detected text emotion
+            user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
+            
+        Yields:
+            str: Response text chunks; a single chunk for cached responses and
+                a single fallback response if the request fails
+        """
+        cache_key = self._cache_key(face_emotion, text_emotion, user_message, history)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        if not self.breaker.allow_request():
+            self._count('rejected_responses')
+            yield self._get_fallback_response(face_emotion, text_emotion)
+            return
+        
+        chunks = []
+        completed = False
+        start = time.monotonic()
+        first_chunk_latency = None
+        try:
+            data = self._build_request(face_emotion, text_emotion, user_message, history)
+            url = f"{self.stream_url}?alt=sse&key={self.api_key}"
+            
+            # The latency budget bounds the wait for each chunk, including the first
+            timeout = (self.timeout, self.latency_budget or self.timeout)
+            with self.session.post(url, json=data, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"Gemini API Error: {response.status_code} - {response.text}")
+                else:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith('data:'):
+                            continue
+                        
+                        event = json.loads(line[len('data:'):].strip())
+                        for candidate in event.get('candidates', [])[:1]:
+                            for part in candidate.get('content', {}).get('parts', []):
+                                if part.get('text'):
+                                    if first_chunk_latency is None:
+                                        first_chunk_latency = time.monotonic() - start
+                                    chunks.append(part['text'])
+                                    yield part['text']
+                    completed = True
+                    
+        except requests.exceptions.Timeout:
+            print("Gemini API stream timed out")
+        except Exception as e:
+            print(f"Error streaming from Gemini API: {e}")
+        finally:
+            # Time to first chunk is what users wait for
+            if first_chunk_latency is not None:
+                self.breaker.record_success(first_chunk_latency)
+            else:
+                self.breaker.record_failure(time.monotonic() - start)
+        
+        if not chunks:
+            yield self._get_fallback_response(face_emotion, text_emotion)
+        elif completed and self.response_cache is not None:
+            # Only complete responses are cached
+            self.response_cache.set(cache_key, ''.join(chunks))
+    
+    def get_response_async(self, face_emotion: str, text_emotion: str, user_message: str,
+                           history: Optional[Dict] = None) -> Future:
+        """
+        Request a response without blocking the caller.
+        
+        Args:
+            face_emotion (str): Detected facial emotion
+            text_emotion (str): Detected text emotion
+            user_message (str): User's message
+            history (dict, optional): Conversation context from ConversationMemory.get_context()
+            
+        Returns:
+            Future: Resolves to the response text (never raises; errors yield a fallback)
+        """
+        return self._executor.submit(self.get_response, face_emotion, text_emotion, user_message, history)
+    
+    def get_cache_stats(self) -> Optional[Dict]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            dict: Cache statistics, or None if caching is disabled
+        """
+        return self.response_cache.get_stats() if self.response_cache is not None else None
+    
+    def get_stats(self) -> Dict:
+        """
+        Get client statistics.
+        
+        Returns:
+            dict: Circuit breaker state, fallbacks served while open or over the
+                latency budget, prompt build time and size, and response cache statistics
+        """
+        with self._stats_lock:
+            prompt_stats = {
+                'built': self.prompts_built,
+                'average_build_ms': (
+                    self.prompt_build_time / self.prompts_built * 1000.0 if self.prompts_built else 0.0
+                ),
+                'max_chars': self.max_prompt_chars
+            }
+        return {
+            'breaker': self.breaker.get_stats(),
+            'latency_budget': self.latency_budget,
+            'hedged_responses': self.hedged_responses,
+            'rejected_responses': self.rejected_responses,
+            'prompt': prompt_stats,
+            'cache': self.get_cache_stats()
+        }
+    
+    def close(self):
+        """Close pooled connections and stop the async worker threads"""
+        self._executor.shutdown(wait=False)
+        self._request_executor.shutdown(wait=False)
+        self.session.close()
     
     def _get_fallback_response(self, face_emotion: str, text_emotion: str) -> str:
         """
@@ -176,16 +536,9 @@ Respond as a caring therapist would:"""
         Returns:
             str: Fallback empathetic response
         """
-        fallback_responses = {
-            'sad': "I can sense that you're going through a difficult time. I'm here to listen and support you. What's been weighing on your mind?",
-            'angry': "I understand you're feeling frustrated or angry. That's completely valid. Can you help me understand what's causing these feelings?",
-            'fear': "I can see you might be feeling anxious or worried. You're safe here, and I want to help you work through whatever is troubling you.",
-            'happy': "It's wonderful to see you in good spirits! I'd love to hear more about what's bringing you joy right now.",
-            'neutral': "Hello! I'm here to listen and support you. How are you feeling today? What would you like to talk about?"
-        }
         
         primary_emotion = face_emotion if face_emotion != 'neutral' else text_emotion
-        return fallback_responses.get(primary_emotion, fallback_responses['neutral'])
+        return FALLBACK_RESPONSES.get(primary_emotion, FALLBACK_RESPONSES['neutral'])
     
     def test_connection(self) -> bool:
         """
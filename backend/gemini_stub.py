@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Gemini Stub Server
+Local stand-in for the Gemini generateContent and streamGenerateContent (SSE)
+endpoints so GeminiClient can be exercised without an API key or network access.
+
+Usage:
+    python gemini_stub.py --port 8765
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta GEMINI_API_KEY=stub python gemini_client.py
+
+Latency and failures can be injected to exercise the circuit breaker:
+    python gemini_stub.py --delay 12 --error-rate 0.3 --error-status 503
+    curl -X POST localhost:8765/control -d '{"delay": 0, "error_rate": 0}'
+
+--block-rate answers a fraction of requests with 200 and no candidates, like
+a prompt blocked by the safety filters.
+
+GET /stats returns the number of requests served per endpoint.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MESSAGE_PATTERN = re.compile(r'User\'s message: "(.*)"\s*\nContext:', re.DOTALL)
+
+class StubState:
+    """Stub options and request counters shared by all handler threads"""
+
+    def __init__(self, chunk_delay=0.05, delay=0.0, error_rate=0.0, error_status=503, block_rate=0.0):
+        self.chunk_delay = chunk_delay
+        self.delay = delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.block_rate = block_rate
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def update(self, options):
+        """Change the injected delay and errors at runtime"""
+        with self._lock:
+            for name in ('chunk_delay', 'delay', 'error_rate', 'error_status', 'block_rate'):
+                if name in options:
+                    setattr(self, name, type(getattr(self, name))(options[name]))
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+def build_reply(request_body):
+    """
+    Build a deterministic reply from the prompt in a generateContent request.
+
+    Args:
+        request_body (dict): Parsed request JSON
+
+    Returns:
+        str: Reply text
+    """
+    try:
+        prompt = request_body['contents'][-1]['parts'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        prompt = ''
+    match = MESSAGE_PATTERN.search(prompt)
+    message = match.group(1) if match else prompt[:80]
+    return f"I hear you. You said: {message}"
+
+def make_handler(state):
+    """Create the request handler class bound to the shared state"""
+
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send_json(200, {'requests': dict(state.requests)})
+            else:
+                self._send_json(404, {'error': {'message': 'Not found'}})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request_body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send_json(400, {'error': {'message': 'Invalid JSON'}})
+                return
+
+            path = self.path.split('?')[0]
+            if path == '/control':
+                state.update(request_body)
+                self._send_json(200, {'delay': state.delay, 'error_rate': state.error_rate,
+                                      'error_status': state.error_status, 'chunk_delay': state.chunk_delay,
+                                      'block_rate': state.block_rate})
+                return
+
+            # Injected latency and failures apply to both generation endpoints
+            time.sleep(state.delay)
+            if random.random() < state.error_rate:
+                state.count('errors')
+                self._send_json(state.error_status, {
+                    'error': {'code': state.error_status, 'message': 'Injected failure', 'status': 'UNAVAILABLE'}
+                })
+                return
+            if random.random() < state.block_rate:
+                state.count('blocked')
+                self._send_blocked(path)
+                return
+
+            if path.endswith(':generateContent'):
+                state.count('generateContent')
+                self._send_json(200, {
+                    'candidates': [{
+                        'content': {'role': 'model', 'parts': [{'text': build_reply(request_body)}]},
+                        'finishReason': 'STOP'
+                    }]
+                })
+            elif path.endswith(':streamGenerateContent'):
+                state.count('streamGenerateContent')
+                self._send_sse(build_reply(request_body))
+            else:
+                self._send_json(404, {'error': {'message': f'Unknown endpoint {path}'}})
+
+        def _send_blocked(self, path):
+            """Answer like a prompt blocked by the safety filters: 200 without candidates"""
+            feedback = {'promptFeedback': {'blockReason': 'SAFETY'}}
+            if not path.endswith(':streamGenerateContent'):
+                self._send_json(200, feedback)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            self.wfile.write(f"data: {json.dumps(feedback)}\r\n\r\n".encode())
+
+        def _send_sse(self, reply):
+            """Stream the reply as server-sent events, a few words per event"""
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            words = reply.split(' ')
+            for start in range(0, len(words), 3):
+                text = ' '.join(words[start:start + 3])
+                if start + 3 < len(words):
+                    text += ' '
+                event = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}]}
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self.wfile.flush()
+                time.sleep(state.chunk_delay)
+
+    return GeminiStubHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini API stub")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--chunk-delay', type=float, default=0.05,
+                        help="Seconds between streamed chunks")
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help="Seconds before answering each generation request")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of generation requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=503,
+                        help="HTTP status of injected errors")
+    parser.add_argument('--block-rate', type=float, default=0.0,
+                        help="Fraction of generation requests answered without candidates")
+    args = parser.parse_args()
+
+    state = StubState(
+        chunk_delay=args.chunk_delay,
+        delay=args.delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        block_rate=args.block_rate
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Gemini stub listening on http://{args.host}:{args.port}/v1beta")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ brightness normalization, and contrast enhancement.
 
 import cv2
 import numpy as np
+import queue
+import threading
+from contextlib import contextmanager
 from enum import Enum
 
 class PreprocessingMethod(Enum):
@@ -19,22 +22,96 @@ class PreprocessingMethod(Enum):
     CONTRAST_ENHANCEMENT = "contrast_enhancement"
     COMBINED = "combined"
 
+class DenoiseMethod(Enum):
+    """Available noise reduction stages, from most to least expensive"""
+    BILATERAL = "bilateral"
+    BILATERAL_FAST = "bilateral_fast"
+    MEDIAN = "median"
+    GAUSSIAN = "gaussian"
+    NONE = "none"
+    ADAPTIVE = "adaptive"
+
+# Kernel used to estimate the noise standard deviation (Immerkaer, 1996)
+NOISE_ESTIMATION_KERNEL = np.array([
+    [1, -2, 1],
+    [-2, 4, -2],
+    [1, -2, 1]
+], dtype=np.float32)
+
+# Pointwise stages applied after CLAHE by the COMBINED method
+COMBINED_POINTWISE_STAGES = (
+    ('brightness', 128),
+    ('contrast', (1.1, 5)),
+)
+
+class ScratchBuffers:
+    """
+    Scratch buffers and CLAHE instance used by one fused pipeline call at a time.
+    """
+    
+    def __init__(self):
+        self.buffers = {}
+        self.clahe = None
+        self.clahe_params = None
+    
+    def get_buffer(self, name, shape):
+        """
+        Get a reusable uint8 scratch buffer.
+        
+        Args:
+            name (str): Buffer name
+            shape (tuple): Required buffer shape
+            
+        Returns:
+            numpy.ndarray: Buffer with the requested shape
+        """
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def get_clahe(self, clip_limit, tile_grid_size):
+        """
+        Get the CLAHE instance of this set, rebuilt when the parameters change.
+        OpenCV CLAHE objects keep internal state and must not be used concurrently.
+        
+        Args:
+            clip_limit (float): CLAHE clip limit
+            tile_grid_size (tuple): CLAHE tile grid size
+            
+        Returns:
+            cv2.CLAHE: CLAHE instance with the given parameters
+        """
+        params = (clip_limit, tuple(tile_grid_size))
+        if self.clahe_params != params:
+            self.clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+            self.clahe_params = params
+        return self.clahe
+
 class ImagePreprocessor:
     """
     Robust image preprocessing for emotion recognition.
     Supports multiple preprocessing methods and combinations.
     """
     
-    def __init__(self, target_size=(224, 224), preprocessing_method=PreprocessingMethod.COMBINED):
+    def __init__(self, target_size=(224, 224), preprocessing_method=PreprocessingMethod.COMBINED,
+                 denoise_method=DenoiseMethod.BILATERAL, max_scratch_sets=8):
         """
         Initialize the image preprocessor.
         
         Args:
             target_size (tuple): Target size for resizing (width, height)
             preprocessing_method (PreprocessingMethod): Method to use for preprocessing
+            denoise_method (DenoiseMethod): Default noise reduction stage
+            max_scratch_sets (int): Scratch buffer sets shared by concurrent fused pipeline calls;
+                further calls wait for a free set
         """
         self.target_size = target_size
         self.preprocessing_method = preprocessing_method
+        self.denoise_method = denoise_method
+        
+        # Estimated noise sigma thresholds used by DenoiseMethod.ADAPTIVE
+        self.adaptive_noise_thresholds = (2.0, 6.0)
         
         # CLAHE parameters
         self.clahe_clip_limit = 3.0
@@ -45,6 +122,161 @@ class ImagePreprocessor:
             clipLimit=self.clahe_clip_limit,
             tileGridSize=self.clahe_tile_grid_size
         )
+        
+        # Scratch buffer sets for the fused pipeline, checked out per call. Request
+        # threads are short-lived, so buffers are pooled rather than kept per thread
+        self.max_scratch_sets = max(1, int(max_scratch_sets))
+        self._scratch_sets = queue.LifoQueue()
+        self._scratch_sets_created = 0
+        self._scratch_lock = threading.Lock()
+        
+        # Denoise stage chosen by the calling thread's latest call
+        self._thread_state = threading.local()
+        
+        # Compiled lookup tables for pointwise stage chains, keyed by stage chain
+        # Each entry is (mean brightness the table was built for, table)
+        self.lut_brightness_tolerance = 0.5
+        self._lut_cache = {}
+    
+    @contextmanager
+    def _checkout_scratch(self):
+        """
+        Borrow a scratch buffer set for one call, creating one while under max_scratch_sets.
+        
+        Yields:
+            ScratchBuffers: Set owned by the caller until the block exits
+        """
+        try:
+            scratch = self._scratch_sets.get_nowait()
+        except queue.Empty:
+            with self._scratch_lock:
+                can_create = self._scratch_sets_created < self.max_scratch_sets
+                if can_create:
+                    self._scratch_sets_created += 1
+            scratch = ScratchBuffers() if can_create else self._scratch_sets.get()
+        try:
+            yield scratch
+        finally:
+            self._scratch_sets.put(scratch)
+    
+    def _compile_pointwise_lut(self, image, stages, current_brightness):
+        """
+        Compile a chain of pointwise stages into a single 256-entry lookup table.
+        
+        Brightness stages need the mean of their input; after earlier stages it is
+        derived exactly from the input histogram mapped through the table so far.
+        
+        Args:
+            image (numpy.ndarray): uint8 image the table is built for
+            stages (tuple): Stage chain, e.g. (('brightness', 128), ('contrast', (1.2, 10)))
+            current_brightness (float): Mean brightness of image
+            
+        Returns:
+            numpy.ndarray: 256-entry uint8 lookup table
+        """
+        values = np.arange(256, dtype=np.float64)
+        histogram = None
+        
+        for index, (stage, params) in enumerate(stages):
+            if stage == 'brightness':
+                if index > 0:
+                    if histogram is None:
+                        flat = image.reshape(-1, 1)
+                        histogram = cv2.calcHist([flat], [0], None, [256], [0, 256]).ravel()
+                    current_brightness = float(np.dot(histogram, values) / histogram.sum())
+                
+                # Same truncation as the original float normalization
+                if current_brightness > 0:
+                    values = np.clip(values * (params / current_brightness), 0, 255).astype(np.uint8).astype(np.float64)
+                
+            elif stage == 'contrast':
+                alpha, beta = params
+                # Same float32 arithmetic, saturation and rounding as cv2.convertScaleAbs
+                scaled = values.astype(np.float32) * np.float32(alpha) + np.float32(beta)
+                values = np.clip(np.rint(np.abs(scaled)), 0, 255).astype(np.float64)
+                
+            else:
+                raise ValueError(f"Unknown pointwise stage: {stage}")
+        
+        return values.astype(np.uint8)
+    
+    @staticmethod
+    def _channel_count(image):
+        """Number of channels in an image"""
+        return image.shape[2] if len(image.shape) == 3 else 1
+    
+    def apply_pointwise(self, image, stages, dst=None):
+        """
+        Apply a chain of pointwise stages in a single cv2.LUT pass.
+        
+        The compiled table is cached per stage chain and only rebuilt when the
+        image's mean brightness moves by more than lut_brightness_tolerance.
+        
+        Args:
+            image (numpy.ndarray): uint8 input image
+            stages (tuple): Stage chain of ('brightness', target) and ('contrast', (alpha, beta))
+            dst (numpy.ndarray, optional): Output buffer with the same shape as image
+            
+        Returns:
+            numpy.ndarray: Transformed image
+        """
+        current_brightness = np.mean(cv2.mean(image)[:self._channel_count(image)])
+        
+        cached = self._lut_cache.get(stages)
+        if cached is not None and abs(cached[0] - current_brightness) <= self.lut_brightness_tolerance:
+            lut = cached[1]
+        else:
+            lut = self._compile_pointwise_lut(image, stages, current_brightness)
+            self._lut_cache[stages] = (current_brightness, lut)
+        
+        if dst is None:
+            return cv2.LUT(image, lut)
+        return cv2.LUT(image, lut, dst=dst)
+    
+    def _preprocess_combined_fused(self, image, dst=None, denoise_method=None):
+        """
+        Run the COMBINED pipeline using pooled scratch buffers.
+        
+        Brightness normalization and contrast enhancement are merged into a single
+        lookup-table pass, so the hot path makes no intermediate allocations.
+        
+        Args:
+            image (numpy.ndarray): Input image
+            dst (numpy.ndarray, optional): Output buffer of the target size
+            denoise_method (DenoiseMethod, optional): Noise reduction stage for this call
+            
+        Returns:
+            numpy.ndarray: Preprocessed image
+        """
+        width, height = self.target_size
+        
+        with self._checkout_scratch() as scratch:
+            clahe = scratch.get_clahe(self.clahe_clip_limit, self.clahe_tile_grid_size)
+            
+            if len(image.shape) == 3:
+                shape = (height, width, 3)
+                resized = cv2.resize(image, self.target_size, dst=scratch.get_buffer('resized', shape),
+                                     interpolation=cv2.INTER_AREA)
+                denoised = self.reduce_noise(resized, denoise_method, dst=scratch.get_buffer('denoised', shape))
+            
+                # CLAHE on the L channel in LAB color space
+                lab = cv2.cvtColor(denoised, cv2.COLOR_BGR2LAB, dst=scratch.get_buffer('lab', shape))
+                l = cv2.extractChannel(lab, 0, dst=scratch.get_buffer('l', (height, width)))
+                l_clahe = clahe.apply(l, dst=scratch.get_buffer('l_clahe', (height, width)))
+                lab = cv2.insertChannel(l_clahe, lab, 0)
+                enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=scratch.get_buffer('enhanced', shape))
+            
+            else:
+                shape = (height, width)
+                resized = cv2.resize(image, self.target_size, dst=scratch.get_buffer('resized', shape),
+                                     interpolation=cv2.INTER_AREA)
+                denoised = self.reduce_noise(resized, denoise_method, dst=scratch.get_buffer('denoised', shape))
+                enhanced = clahe.apply(denoised, dst=scratch.get_buffer('enhanced', shape))
+            
+            # Brightness normalization and contrast enhancement in one pass
+            if dst is None:
+                dst = np.empty(shape, dtype=np.uint8)
+            return self.apply_pointwise(enhanced, COMBINED_POINTWISE_STAGES, dst)
     
     def resize_image(self, image):
         """
@@ -58,17 +290,68 @@ class ImagePreprocessor:
         """
         return cv2.resize(image, self.target_size, interpolation=cv2.INTER_AREA)
     
-    def reduce_noise(self, image):
+    def estimate_noise(self, image):
         """
-        Apply noise reduction using bilateral filter.
+        Estimate the noise standard deviation of an image.
+        Uses a Laplacian-difference kernel that cancels smooth image structure.
         
         Args:
             image (numpy.ndarray): Input image
             
         Returns:
-            numpy.ndarray: Denoised image
+            float: Estimated noise sigma in gray levels
         """
-        return cv2.bilateralFilter(image, 9, 75, 75)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+        height, width = gray.shape[:2]
+        if height < 3 or width < 3:
+            return 0.0
+        
+        response = cv2.filter2D(gray, cv2.CV_32F, NOISE_ESTIMATION_KERNEL)
+        total = cv2.norm(response[1:-1, 1:-1], cv2.NORM_L1)
+        return float(total * np.sqrt(0.5 * np.pi) / (6.0 * (width - 2) * (height - 2)))
+    
+    def _select_denoise_method(self, image, method):
+        """Resolve ADAPTIVE to a concrete denoise stage based on the estimated noise level"""
+        if method != DenoiseMethod.ADAPTIVE:
+            return method
+        
+        low, high = self.adaptive_noise_thresholds
+        sigma = self.estimate_noise(image)
+        if sigma < low:
+            return DenoiseMethod.NONE
+        if sigma < high:
+            return DenoiseMethod.GAUSSIAN
+        return DenoiseMethod.BILATERAL_FAST
+    
+    @property
+    def last_denoise_method(self):
+        """Denoise stage that ran in the calling thread's most recent preprocess call"""
+        return getattr(self._thread_state, 'last_denoise_method', None)
+    
+    def reduce_noise(self, image, method=None, dst=None):
+        """
+        Apply noise reduction.
+        
+        Args:
+            image (numpy.ndarray): Input image
+            method (DenoiseMethod, optional): Denoise stage; defaults to the preprocessor's denoise_method
+            dst (numpy.ndarray, optional): Output buffer with the same shape as image
+            
+        Returns:
+            numpy.ndarray: Denoised image (the input itself when no denoising runs)
+        """
+        method = self._select_denoise_method(image, method or self.denoise_method)
+        self._thread_state.last_denoise_method = method
+        
+        if method == DenoiseMethod.NONE:
+            return image
+        if method == DenoiseMethod.BILATERAL_FAST:
+            return cv2.bilateralFilter(image, 5, 50, 50, dst=dst)
+        if method == DenoiseMethod.MEDIAN:
+            return cv2.medianBlur(image, 3, dst=dst)
+        if method == DenoiseMethod.GAUSSIAN:
+            return cv2.GaussianBlur(image, (5, 5), 0, dst=dst)
+        return cv2.bilateralFilter(image, 9, 75, 75, dst=dst)
     
     def grayscale_equalization(self, image):
         """
@@ -163,6 +446,9 @@ class ImagePreprocessor:
         Returns:
             numpy.ndarray: Brightness normalized image
         """
+        if image.dtype == np.uint8:
+            return self.apply_pointwise(image, (('brightness', target_brightness),))
+        
         # Calculate current brightness
         current_brightness = np.mean(image)
         
@@ -188,14 +474,20 @@ class ImagePreprocessor:
         Returns:
             numpy.ndarray: Contrast enhanced image
         """
+        if image.dtype == np.uint8:
+            return self.apply_pointwise(image, (('contrast', (alpha, beta)),))
+        
         return cv2.convertScaleAbs(image, alpha=alpha, beta=beta)
     
-    def preprocess(self, image):
+    def preprocess(self, image, dst=None, denoise_method=None):
         """
         Apply comprehensive preprocessing based on selected method.
+        The denoise stage that ran is available afterwards as last_denoise_method.
         
         Args:
-            image (numpy.ndarray): Input image
+            image (numpy.ndarray): Input image (not modified)
+            dst (numpy.ndarray, optional): Output buffer matching the preprocessed shape
+            denoise_method (DenoiseMethod, optional): Noise reduction stage for this call
             
         Returns:
             numpy.ndarray: Preprocessed image
@@ -203,56 +495,46 @@ class ImagePreprocessor:
         if image is None:
             raise ValueError("Input image is None")
         
-        # Start with a copy
-        processed = image.copy()
+        if self.preprocessing_method == PreprocessingMethod.COMBINED:
+            return self._preprocess_combined_fused(image, dst, denoise_method)
+        
+        # Every pipeline starts with a resize, which never modifies the input
+        processed = image
         
         # Apply preprocessing based on selected method
         if self.preprocessing_method == PreprocessingMethod.GRAYSCALE_EQUALIZATION:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.grayscale_equalization(processed)
             
         elif self.preprocessing_method == PreprocessingMethod.COLOR_EQUALIZATION:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.color_equalization(processed)
             
         elif self.preprocessing_method == PreprocessingMethod.CLAHE:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.apply_clahe_grayscale(processed)
             
         elif self.preprocessing_method == PreprocessingMethod.CLAHE_COLOR:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.apply_clahe_color(processed)
             
         elif self.preprocessing_method == PreprocessingMethod.BRIGHTNESS_NORMALIZATION:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.normalize_brightness(processed)
             
         elif self.preprocessing_method == PreprocessingMethod.CONTRAST_ENHANCEMENT:
             processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, denoise_method)
             processed = self.enhance_contrast(processed)
             
-        elif self.preprocessing_method == PreprocessingMethod.COMBINED:
-            # Apply comprehensive preprocessing pipeline
-            processed = self.resize_image(processed)
-            processed = self.reduce_noise(processed)
-            
-            # Apply CLAHE in LAB color space for better results
-            if len(processed.shape) == 3:
-                processed = self.apply_clahe_color(processed)
-            else:
-                processed = self.apply_clahe_grayscale(processed)
-            
-            # Normalize brightness
-            processed = self.normalize_brightness(processed)
-            
-            # Enhance contrast slightly
-            processed = self.enhance_contrast(processed, alpha=1.1, beta=5)
+        if dst is not None:
+            np.copyto(dst, processed)
+            return dst
         
         return processed
     
@@ -265,6 +547,15 @@ class ImagePreprocessor:
         """
         self.preprocessing_method = method
     
+    def set_denoise_method(self, method):
+        """
+        Change the default noise reduction stage.
+        
+        Args:
+            method (DenoiseMethod): New denoise stage
+        """
+        self.denoise_method = method
+    
     def set_clahe_parameters(self, clip_limit, tile_grid_size):
         """
         Update CLAHE parameters.
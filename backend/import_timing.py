@@ -0,0 +1,48 @@
+"""
+Import Timing Module
+Records how long groups of imports take so cold-start regressions show up
+in the startup log and on /healthz.
+For a full per-module breakdown run: python -X importtime app.py
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+_timings = {}
+_lock = threading.Lock()
+
+@contextmanager
+def timed_import(name: str):
+    """
+    Time the imports inside a with block.
+    Only the first (cold) import of a name is recorded.
+
+    Args:
+        name: Label for the imported module or group
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _timings.setdefault(name, elapsed)
+
+def get_import_timings() -> Dict[str, float]:
+    """
+    Get the recorded import times.
+
+    Returns:
+        dict: Name -> seconds, in import order
+    """
+    with _lock:
+        return {name: round(elapsed, 4) for name, elapsed in _timings.items()}
+
+def report_import_timings():
+    """Print the recorded import times, slowest first"""
+    timings = get_import_timings()
+    print(f"Imports took {sum(timings.values()):.2f}s:")
+    for name, elapsed in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {name:<24} {elapsed * 1000:8.1f}ms")
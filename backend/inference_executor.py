@@ -0,0 +1,259 @@
+"""
+Inference Executor Module
+Runs the CPU-bound face model passes (SSD face detection and emotion
+classification) in a pool of worker processes, outside the interpreter that
+serves HTTP and Socket.IO traffic.
+
+Each worker loads the face models once at startup. Frames are handed over
+through shared memory, and batches are split into chunks so one batch can
+use several cores.
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from shared_frames import SharedFrameBuffer, SharedFrameReader
+
+# Detector methods a worker may run, by task kind
+TASK_METHODS = {
+    'detect_faces': '_detect_faces_local',
+    'classify_faces': '_classify_faces_local'
+}
+
+# Seconds a warmed-up worker waits for the other workers to finish loading
+WARM_UP_TIMEOUT = 600.0
+
+# State of a worker process
+_worker_detector = None
+_worker_reader = None
+_worker_barrier = None
+
+def create_worker_detector():
+    """
+    Build the detector used inside a worker process from the environment.
+    Only the face models are loaded; text inference stays in the web process.
+
+    Returns:
+        EmotionDetector: Detector with face models loaded
+    """
+    from emotion_detector import EmotionDetector
+
+    detector = EmotionDetector.from_env(load_text_model=False, text_cache_size=0)
+    try:
+        detector.load_face_emotion_model()
+    except Exception as e:
+        print(f"Warning: Could not load face emotion model in worker {os.getpid()}: {e}")
+    return detector
+
+def _initialize_worker(detector_factory: Callable[[], Any], warm_up_barrier):
+    """Process pool initializer: warm the models once per worker"""
+    global _worker_detector, _worker_reader, _worker_barrier
+    _worker_detector = detector_factory()
+    _worker_reader = SharedFrameReader()
+    _worker_barrier = warm_up_barrier
+
+def _worker_status() -> Dict[str, Any]:
+    """Report which models a worker has loaded, once every worker is ready to report"""
+    # Holding each worker here until all have arrived makes every worker answer exactly one call
+    try:
+        _worker_barrier.wait(WARM_UP_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    return {
+        'pid': os.getpid(),
+        'face_detector': _worker_detector.face_detector is not None,
+        'face_emotion_model': _worker_detector.face_emotion_model is not None
+    }
+
+def _run_worker_task(kind: str, descriptor, args: tuple):
+    """
+    Run one chunk inside a worker process.
+
+    Returns:
+        tuple: (result, seconds spent)
+    """
+    start = time.perf_counter()
+    frames = _worker_reader.read(descriptor)
+    result = getattr(_worker_detector, TASK_METHODS[kind])(frames, *args)
+    return result, time.perf_counter() - start
+
+def create_inference_executor_from_env():
+    """
+    Create the executor configured by INFERENCE_EXECUTOR, INFERENCE_WORKERS and
+    INFERENCE_MIN_CHUNK.
+
+    Returns:
+        InferenceExecutor: Executor, or None to run inference on the calling thread
+    """
+    mode = os.getenv('INFERENCE_EXECUTOR', 'inline')
+    if mode == 'inline':
+        return None
+    if mode != 'process':
+        raise ValueError(f"Unknown inference executor: {mode}")
+    return InferenceExecutor(
+        workers=int(os.getenv('INFERENCE_WORKERS', '0')) or None,
+        min_chunk_size=int(os.getenv('INFERENCE_MIN_CHUNK', '4'))
+    )
+
+class InferenceExecutor:
+    """
+    Process pool that EmotionDetector hands its face model passes to.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_chunk_size: int = 4,
+                 detector_factory: Callable[[], Any] = create_worker_detector):
+        """
+        Initialize the executor. Workers start on warm_up() or the first task.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            min_chunk_size: Smallest number of frames sent to one worker
+            detector_factory: Picklable top-level function building a worker's detector
+        """
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.min_chunk_size = max(1, int(min_chunk_size))
+        self.detector_factory = detector_factory
+
+        # Never fork a parent that may already hold TensorFlow or torch state
+        context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(detector_factory, context.Barrier(self.workers))
+        )
+
+        # Each in-flight chunk owns a shared memory block until it completes
+        self._buffers = queue.Queue()
+        for _ in range(2 * self.workers):
+            self._buffers.put(SharedFrameBuffer())
+
+        self._warm_lock = threading.Lock()
+        self._worker_status = None
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.in_flight = 0
+        self.tasks_completed = 0
+        self.tasks_failed = 0
+        self.busy_time = 0.0
+
+    def warm_up(self) -> List[Dict[str, Any]]:
+        """
+        Start the workers and wait until their models are loaded.
+
+        Returns:
+            list: Loaded models per worker process
+
+        Raises:
+            RuntimeError: If a worker could not load the face models
+        """
+        with self._warm_lock:
+            if self._worker_status is None:
+                # One task per worker starts all of them; each task waits for the others
+                futures = [self._pool.submit(_worker_status) for _ in range(self.workers)]
+                statuses = {status['pid']: status for status in (f.result() for f in futures)}
+                self._worker_status = list(statuses.values())
+
+        for status in self._worker_status:
+            if not (status['face_detector'] and status['face_emotion_model']):
+                raise RuntimeError(f"Inference worker {status['pid']} could not load the face models")
+        return self._worker_status
+
+    def run(self, kind: str, frames: List, *args) -> list:
+        """
+        Run a task over frames, split into chunks across workers.
+
+        Args:
+            kind: 'detect_faces' or 'classify_faces'
+            frames: Images or face crops
+            *args: Extra arguments passed to the detector method
+
+        Returns:
+            list: One result per frame, in input order
+        """
+        if not frames:
+            return []
+
+        chunk_size = max(self.min_chunk_size, math.ceil(len(frames) / self.workers))
+        futures = [
+            self._submit(kind, frames[start:start + chunk_size], args)
+            for start in range(0, len(frames), chunk_size)
+        ]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def _submit(self, kind: str, frames: List, args: tuple) -> Future:
+        """Queue one chunk and return a future resolving to its results"""
+        with self._lock:
+            self.in_flight += 1
+
+        buffer = self._buffers.get()
+        try:
+            task = self._pool.submit(_run_worker_task, kind, buffer.write(frames), args)
+        except Exception as e:
+            self._buffers.put(buffer)
+            self._finish(e, 0.0)
+            raise
+
+        result = Future()
+
+        def done(completed):
+            self._buffers.put(buffer)
+            try:
+                value, elapsed = completed.result()
+            except Exception as e:
+                self._finish(e, 0.0)
+                result.set_exception(e)
+                return
+            self._finish(None, elapsed)
+            result.set_result(value)
+
+        task.add_done_callback(done)
+        return result
+
+    def _finish(self, error: Optional[Exception], elapsed: float):
+        """Record the outcome of a chunk"""
+        with self._lock:
+            self.in_flight -= 1
+            self.busy_time += elapsed
+            if error is None:
+                self.tasks_completed += 1
+            else:
+                self.tasks_failed += 1
+                print(f"Error in inference worker: {error}")
+
+    def shutdown(self):
+        """Stop the workers and release the shared memory blocks"""
+        self._pool.shutdown(wait=True)
+        while not self._buffers.empty():
+            self._buffers.get_nowait().close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            dict: Chunks in flight and waiting for a worker, completed and failed
+                counts, and the fraction of worker time spent on inference
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at
+            completed = self.tasks_completed
+            return {
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - self.workers),
+                'tasks_completed': completed,
+                'tasks_failed': self.tasks_failed,
+                'average_task_ms': self.busy_time / completed * 1000.0 if completed else 0.0,
+                'worker_utilization': min(1.0, self.busy_time / (self.workers * elapsed)) if elapsed > 0 else 0.0
+            }
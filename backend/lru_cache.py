@@ -0,0 +1,214 @@
+"""
+LRU Cache Module
+Bounded, thread-safe least-recently-used cache with optional expiry and an
+optional SQLite file backing so entries survive restarts.
+
+Writes to the SQLite file are queued and committed in batches by a
+background thread, so lookups and stores never wait on disk.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional time-to-live and on-disk persistence.
+    Persisted values must be JSON-serializable and are not changed after being stored.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None,
+                 persist_path: Optional[str] = None, name: str = "cache",
+                 flush_interval: float = 1.0, max_pending: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept in memory
+            ttl: Seconds an entry stays valid (None = no expiry)
+            persist_path: SQLite file used to persist entries across restarts
+            name: Table name used in the SQLite file
+            flush_interval: Seconds between commits of queued writes to the SQLite file
+            max_pending: Queued writes that trigger a commit before the interval ends
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, int(max_pending))
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Key -> (value, expires_at, updated_at) to write, or None to delete
+        self._pending = {}
+        self._db_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if persist_path:
+            self._open_store(persist_path)
+        if self._db is not None:
+            self._writer = threading.Thread(target=self._run_writer, name=f"{name}-writer")
+            self._writer.daemon = True
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _open_store(self, persist_path: str):
+        """Open the SQLite store and warm the in-memory cache from it"""
+        try:
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}" '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, updated_at REAL NOT NULL)'
+            )
+            now = time.time()
+            self._db.execute(
+                f'DELETE FROM "{self.name}" WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+            )
+            # Keep the store bounded to what fits in memory
+            self._db.execute(
+                f'DELETE FROM "{self.name}" WHERE key NOT IN '
+                f'(SELECT key FROM "{self.name}" ORDER BY updated_at DESC LIMIT ?)',
+                (self.max_size,)
+            )
+            self._db.commit()
+
+            rows = self._db.execute(
+                f'SELECT key, value, expires_at FROM "{self.name}" ORDER BY updated_at DESC LIMIT ?',
+                (self.max_size,)
+            ).fetchall()
+
+            # Oldest first so the most recently written entries end up most recently used
+            for key, value, expires_at in reversed(rows):
+                self._entries[key] = (json.loads(value), expires_at)
+
+        except Exception as e:
+            print(f"Warning: Could not open cache store {persist_path}: {e}")
+            self._db = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a key, counting a hit or miss.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                if self._db is not None:
+                    self._pending[key] = None
+
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._pending[key] = (value, expires_at, time.time())
+
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                if self._db is not None:
+                    self._pending[evicted] = None
+
+            if len(self._pending) >= self.max_pending:
+                self._flush_requested.set()
+
+    def _run_writer(self):
+        """Commit queued writes every flush_interval seconds, or sooner when many are queued"""
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def flush(self):
+        """Commit queued writes to the persistent store in one transaction"""
+        if self._db is None:
+            return
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                upserts = []
+                deletes = []
+                for key, entry in pending.items():
+                    if entry is None:
+                        deletes.append((key,))
+                    else:
+                        value, expires_at, updated_at = entry
+                        upserts.append((key, json.dumps(value), expires_at, updated_at))
+                with self._db:
+                    self._db.executemany(
+                        f'INSERT OR REPLACE INTO "{self.name}" (key, value, expires_at, updated_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        upserts
+                    )
+                    self._db.executemany(f'DELETE FROM "{self.name}" WHERE key = ?', deletes)
+            except Exception as e:
+                print(f"Warning: Could not persist {len(pending)} cache entries: {e}")
+
+    def clear(self):
+        """Remove all entries from memory and the persistent store"""
+        with self._db_lock:
+            with self._lock:
+                self._entries.clear()
+                self._pending.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(f'DELETE FROM "{self.name}"')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Size, hit/miss/eviction counters and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'persistent': self._db is not None
+        }
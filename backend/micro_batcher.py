@@ -0,0 +1,166 @@
+"""
+Micro-batching Module
+Coalesces concurrent inference requests into a single batched call.
+Requests submitted from many request threads within a short window are
+grouped together and handed to one batch function.
+"""
+
+import threading
+import queue
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """
+    Collects items submitted from concurrent callers and runs them through
+    a batch function as one call.
+
+    The batch function receives one list per positional argument passed to
+    ``submit`` (column-wise) and must return a list with one result per item.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0, name="micro-batcher"):
+        """
+        Initialize the micro-batcher and start its worker thread.
+
+        Args:
+            batch_fn (callable): Function called with column-wise argument lists
+            max_batch_size (int): Maximum number of items per batch
+            max_wait_ms (float): Maximum time to wait for more items after the first one arrives
+            name (str): Name of the worker thread
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._running = True
+        # Keeps items from being queued behind the stop marker
+        self._submit_lock = threading.Lock()
+
+        # Simple counters for monitoring
+        self.batches_run = 0
+        self.items_processed = 0
+
+        self._worker = threading.Thread(target=self._run, name=name)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def submit(self, *args, timeout=None):
+        """
+        Submit one item and block until its batch has been processed.
+
+        Args:
+            *args: Positional arguments for this item
+            timeout (float, optional): Maximum time to wait for the result in seconds
+
+        Returns:
+            Result produced by the batch function for this item
+
+        Raises:
+            Exception: Whatever the batch function raised for this item's batch
+        """
+        return self.submit_async(*args).result(timeout=timeout)
+
+    def submit_async(self, *args):
+        """
+        Submit one item without waiting for the result.
+
+        Args:
+            *args: Positional arguments for this item
+
+        Returns:
+            Future: Resolved with the result for this item
+
+        Raises:
+            RuntimeError: If the batcher has been stopped
+        """
+        future = Future()
+        with self._submit_lock:
+            if not self._running:
+                raise RuntimeError(f"{self.name} has been stopped")
+            self._queue.put((args, future))
+        return future
+
+    def stop(self, timeout=None):
+        """
+        Stop the worker thread once the items submitted so far are processed.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the worker thread in seconds
+        """
+        with self._submit_lock:
+            self._running = False
+            self._queue.put(None)
+        self._worker.join(timeout)
+
+    def get_stats(self):
+        """
+        Get batching statistics.
+
+        Returns:
+            dict: Batch counters and current queue depth
+        """
+        return {
+            'batches_run': self.batches_run,
+            'items_processed': self.items_processed,
+            'average_batch_size': (
+                self.items_processed / self.batches_run if self.batches_run else 0.0
+            ),
+            'queue_depth': self._queue.qsize()
+        }
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until the batch is full or the window closes"""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the stop marker so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        """Worker loop that processes batches until stopped"""
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """Run one batch through the batch function and resolve its futures"""
+        futures = [future for _, future in batch]
+        columns = [list(column) for column in zip(*[args for args, _ in batch])]
+
+        try:
+            results = self.batch_fn(*columns)
+            if len(results) != len(futures):
+                raise RuntimeError(
+                    f"{self.name}: batch function returned {len(results)} results for {len(futures)} items"
+                )
+            for future, result in zip(futures, results):
+                future.set_result(result)
+        except Exception as e:
+            print(f"Error in {self.name}: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+        self.batches_run += 1
+        self.items_processed += len(batch)
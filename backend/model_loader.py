@@ -0,0 +1,180 @@
+"""
+Model Loading Module
+Loads models and other slow components in background threads, or lazily on
+first use, and tracks per-component load state and load time for health checks.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+class ModelLoader:
+    """
+    Registry of named components that are loaded in parallel or on demand.
+    """
+
+    PENDING = 'pending'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, mode: str = 'background'):
+        """
+        Initialize the loader.
+
+        Args:
+            mode: 'background' loads everything in parallel threads on start(),
+                'lazy' loads each component on first use,
+                'eager' loads everything in parallel and waits in start()
+        """
+        if mode not in ('background', 'lazy', 'eager'):
+            raise ValueError(f"Unknown model loading mode: {mode}")
+
+        self.mode = mode
+        self._components = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], required: bool = True):
+        """
+        Register a component.
+
+        Args:
+            name: Component name
+            factory: Callable that loads the component and returns it (may return None)
+            required: Whether the service is not ready until this component is loaded
+        """
+        self._components[name] = {
+            'factory': factory,
+            'required': required,
+            'state': self.PENDING,
+            'value': None,
+            'error': None,
+            'started_at': None,
+            'load_time': None,
+            'event': threading.Event()
+        }
+
+    def start(self):
+        """Start loading according to the loading mode"""
+        if self.mode == 'lazy':
+            return
+
+        for name in self._components:
+            self._start_loading(name)
+
+        if self.mode == 'eager':
+            self.wait(self._components.keys())
+
+    def _start_loading(self, name: str) -> bool:
+        """Start loading a component in a background thread if it has not started yet"""
+        component = self._components[name]
+        with self._lock:
+            if component['state'] != self.PENDING:
+                return False
+            component['state'] = self.LOADING
+            component['started_at'] = time.time()
+
+        thread = threading.Thread(target=self._load, args=(name,), name=f"load-{name}")
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _load(self, name: str):
+        """Load one component and record the outcome"""
+        component = self._components[name]
+        start = time.perf_counter()
+        try:
+            component['value'] = component['factory']()
+            component['state'] = self.READY
+            print(f"Loaded {name} in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            component['error'] = str(e)
+            component['state'] = self.FAILED
+            print(f"Warning: Could not load {name}: {e}")
+        finally:
+            component['load_time'] = time.perf_counter() - start
+            component['event'].set()
+
+    def wait(self, names: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until components are loaded, starting any that are still pending.
+
+        Args:
+            names: Component names
+            timeout: Maximum seconds to wait in total (None = no limit, 0 = do not wait)
+
+        Returns:
+            bool: True if every component is ready
+        """
+        names = list(names)
+        for name in names:
+            self._start_loading(name)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._components[name]['event'].wait(remaining)
+
+        return all(self.is_ready(name) for name in names)
+
+    def is_ready(self, name: str) -> bool:
+        """
+        Check whether a component has loaded successfully.
+
+        Args:
+            name: Component name
+
+        Returns:
+            bool: True if ready
+        """
+        return self._components[name]['state'] == self.READY
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Get a loaded component, loading it first if needed.
+
+        Args:
+            name: Component name
+            timeout: Maximum seconds to wait for the load
+
+        Returns:
+            The loaded component
+
+        Raises:
+            RuntimeError: If the component failed to load or is not ready in time
+        """
+        if not self.wait([name], timeout):
+            component = self._components[name]
+            if component['state'] == self.FAILED:
+                raise RuntimeError(f"{name} failed to load: {component['error']}")
+            raise RuntimeError(f"{name} is not loaded yet")
+        return self._components[name]['value']
+
+    def all_ready(self) -> bool:
+        """Whether every required component is ready"""
+        return all(
+            self.is_ready(name)
+            for name, component in self._components.items()
+            if component['required']
+        )
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the load state of every component.
+
+        Returns:
+            dict: Component name -> state, load time in seconds and error
+        """
+        now = time.time()
+        status = {}
+        for name, component in self._components.items():
+            load_time = component['load_time']
+            if component['state'] == self.LOADING and component['started_at']:
+                load_time = now - component['started_at']
+            status[name] = {
+                'state': component['state'],
+                'required': component['required'],
+                'load_time': round(load_time, 3) if load_time is not None else None,
+                'error': component['error']
+            }
+        return status
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Model Server Module
+Hosts one EmotionDetector per node so several web worker processes share a
+single copy of the face detector, the face emotion model and EmoRoBERTa.
+
+Web workers talk to the server through ModelClient over a local socket
+(multiprocessing.connection). Frames travel through shared memory; only a
+small descriptor goes over the socket. Requests from all workers are
+micro-batched together on the server.
+
+Usage:
+    export MODEL_SERVER_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    python model_server.py                       # listens on MODEL_SERVER_ADDRESS
+    MODEL_SERVER_ADDRESS=/tmp/hope-models.sock python app.py
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from emotion_detector import EmotionDetector
+from inference_executor import create_inference_executor_from_env
+from micro_batcher import MicroBatcher
+from model_loader import ModelLoader
+from shared_frames import SharedFrameBuffer, SharedFrameReader
+
+DEFAULT_ADDRESS = '/tmp/hope-model-server.sock'
+
+# Requests are unpickled, so the key must be a secret: anyone holding it can run code on the server
+MIN_AUTHKEY_LENGTH = 16
+
+# Marks an argument column whose values were sent through shared memory
+SHARED_FRAMES = 'shared_frames'
+
+def parse_address(address: str) -> Tuple[Any, str]:
+    """
+    Parse a server address.
+
+    Args:
+        address: Unix socket path, or host:port for TCP
+
+    Returns:
+        tuple: (address, connection family)
+    """
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return (host, int(port)), 'AF_INET'
+    return address, 'AF_UNIX'
+
+def get_authkey_from_env() -> str:
+    """
+    Read the shared secret from MODEL_SERVER_AUTHKEY.
+
+    Returns:
+        str: Authentication key
+
+    Raises:
+        ValueError: If the key is unset or too short
+    """
+    authkey = os.getenv('MODEL_SERVER_AUTHKEY', '')
+    if len(authkey) < MIN_AUTHKEY_LENGTH:
+        raise ValueError(
+            f"MODEL_SERVER_AUTHKEY must be set to a secret of at least {MIN_AUTHKEY_LENGTH} characters "
+            "(e.g. python -c \"import secrets; print(secrets.token_hex(32))\")"
+        )
+    return authkey
+
+class ModelServer:
+    """
+    Serves EmotionDetector inference to ModelClient connections.
+    """
+
+    def __init__(self, detector: EmotionDetector, model_loader: ModelLoader, authkey: str,
+                 address: str = DEFAULT_ADDRESS, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        """
+        Initialize the server.
+
+        Args:
+            detector: Detector that owns the models
+            model_loader: Loader tracking the detector's models
+            authkey: Shared secret clients must present
+            address: Unix socket path or host:port to listen on
+            max_batch_size: Maximum items per batched forward pass
+            max_wait_ms: How long to wait for more items before running a batch
+        """
+        self.detector = detector
+        self.model_loader = model_loader
+        self.address = address
+        self.authkey = authkey.encode()
+        self.active_connections = 0
+        self._lock = threading.Lock()
+
+        # The face batchers run on separate threads but share the detector's cv2.dnn
+        # net and emotion model, whose setInput/forward state is not thread-safe.
+        # Worker processes of an inference executor each have their own models.
+        self._face_model_lock = threading.Lock() if detector.inference_executor is None else nullcontext()
+
+        def batcher(fn, name, face_models=False):
+            if face_models:
+                fn = self._with_face_models(fn)
+            return MicroBatcher(fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, name=name)
+
+        self.batchers = {
+            'detect_faces_batch': batcher(
+                lambda frames, session_ids: detector.detect_faces_batch(frames, session_ids=session_ids),
+                'server-face-detection-batcher', face_models=True
+            ),
+            'classify_face_emotions': batcher(
+                detector.classify_face_emotions, 'server-face-classification-batcher', face_models=True
+            ),
+            'get_face_emotion_confidences': batcher(
+                detector.get_face_emotion_confidences, 'server-frame-batcher', face_models=True
+            ),
+            'analyze_texts': batcher(detector.analyze_texts, 'server-text-batcher')
+        }
+
+    def _with_face_models(self, fn):
+        """Wrap a batch function so only one face model pass runs at a time"""
+        def run(*columns):
+            with self._face_model_lock:
+                return fn(*columns)
+        return run
+
+    def serve_forever(self):
+        """Accept connections until the process is stopped"""
+        address, family = parse_address(self.address)
+        if family == 'AF_UNIX' and os.path.exists(address):
+            # Left behind by a previous server
+            os.unlink(address)
+
+        with Listener(address, family=family, authkey=self.authkey) as listener:
+            if family == 'AF_UNIX':
+                # Only the user running the server may connect
+                os.chmod(address, 0o600)
+            print(f"Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"Error accepting model client: {e}")
+                    continue
+                thread = threading.Thread(target=self._handle_connection, args=(conn,), name="model-client")
+                thread.daemon = True
+                thread.start()
+
+    def _handle_connection(self, conn):
+        """Answer requests from one client connection until it closes"""
+        # Each client connection reuses one shared memory block for its frames
+        reader = SharedFrameReader(max_blocks=1)
+        with self._lock:
+            self.active_connections += 1
+        try:
+            while True:
+                try:
+                    method, columns = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                try:
+                    response = ('ok', self._dispatch(method, columns, reader))
+                except Exception as e:
+                    print(f"Error in model server {method}: {e}")
+                    response = ('error', str(e))
+                conn.send(response)
+        finally:
+            with self._lock:
+                self.active_connections -= 1
+            reader.close()
+            conn.close()
+
+    def _dispatch(self, method: str, columns: list, reader: SharedFrameReader) -> Any:
+        """
+        Run one request.
+
+        Args:
+            method: Detector method name, 'status' or 'stats'
+            columns: One list per argument, one entry per item
+            reader: Shared frame reader of the connection
+
+        Returns:
+            Method result
+        """
+        if method == 'status':
+            return self.model_loader.status()
+        if method == 'stats':
+            return self.get_stats()
+
+        batcher = self.batchers.get(method)
+        if batcher is None:
+            raise ValueError(f"Unknown model server method: {method}")
+
+        columns = [
+            reader.read(column[1]) if isinstance(column, tuple) and column[0] == SHARED_FRAMES else column
+            for column in columns
+        ]
+        futures = [batcher.submit_async(*item) for item in zip(*columns)]
+        return [future.result() for future in futures]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get server statistics.
+
+        Returns:
+            dict: Batcher and text cache statistics and the number of connected clients
+        """
+        text_cache = self.detector.text_cache
+        return {
+            'active_connections': self.active_connections,
+            'batchers': {name: batcher.get_stats() for name, batcher in self.batchers.items()},
+            'text_cache': text_cache.get_stats() if text_cache else None,
+            'inference_executor': (
+                self.detector.inference_executor.get_stats() if self.detector.inference_executor else None
+            )
+        }
+
+class ModelClient:
+    """
+    Drop-in replacement for the EmotionDetector inference methods used by
+    app.py that forwards every call to a ModelServer.
+    """
+
+    # Crops are plain array slicing and need no model
+    extract_face_roi = staticmethod(EmotionDetector.extract_face_roi)
+
+    def __init__(self, authkey: str, address: str = DEFAULT_ADDRESS, max_connections: int = 8,
+                 timeout: float = 30.0):
+        """
+        Initialize the client. Connections are opened on first use.
+
+        Args:
+            authkey: Shared secret configured on the server
+            address: Unix socket path or host:port of the model server
+            max_connections: Maximum concurrent connections (one in-flight request each)
+            timeout: Seconds to wait for a free connection and for each answer
+        """
+        self.address = address
+        self.authkey = authkey.encode()
+        self.max_connections = max(1, int(max_connections))
+        self.timeout = timeout
+
+        # The cache lives on the server
+        self.text_cache = None
+
+        self._channels = queue.LifoQueue()
+        self._open_channels = 0
+        self._lock = threading.Lock()
+
+    def _acquire_channel(self) -> dict:
+        """Take an idle connection, opening a new one if the pool is not full"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return self._channels.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_open = self._open_channels < self.max_connections
+                if can_open:
+                    self._open_channels += 1
+            if can_open:
+                break
+
+            # Wake up regularly: a discarded channel frees a slot without being put back
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no free connection after {self.timeout}s")
+            try:
+                return self._channels.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+
+        try:
+            address, family = parse_address(self.address)
+            return {
+                'conn': Client(address, family=family, authkey=self.authkey),
+                'frames': SharedFrameBuffer()
+            }
+        except Exception:
+            with self._lock:
+                self._open_channels -= 1
+            raise
+
+    def _discard_channel(self, channel: dict):
+        """Close a broken connection"""
+        with self._lock:
+            self._open_channels -= 1
+        try:
+            channel['conn'].close()
+        except Exception:
+            pass
+        channel['frames'].close()
+
+    def _call(self, method: str, *columns: Sequence, frame_columns: Tuple[int, ...] = ()) -> Any:
+        """
+        Send one request and wait for the answer.
+
+        Args:
+            method: Server method name
+            *columns: One list per argument, one entry per item
+            frame_columns: Indexes of columns holding images, sent through shared memory
+
+        Returns:
+            Method result
+
+        Raises:
+            RuntimeError: If the server is unreachable or the call failed
+        """
+        try:
+            channel = self._acquire_channel()
+        except Exception as e:
+            raise RuntimeError(f"Model server unavailable at {self.address}: {e}")
+
+        # A channel is only reused after a complete request/answer exchange;
+        # after any error its connection may hold a late answer
+        reusable = False
+        try:
+            payload = [
+                (SHARED_FRAMES, channel['frames'].write(column)) if index in frame_columns else list(column)
+                for index, column in enumerate(columns)
+            ]
+            channel['conn'].send((method, payload))
+            if not channel['conn'].poll(self.timeout):
+                raise RuntimeError(f"Model server {method} timed out after {self.timeout}s")
+            status, result = channel['conn'].recv()
+            reusable = True
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"Lost connection to model server: {e}")
+        finally:
+            if reusable:
+                self._channels.put(channel)
+            else:
+                self._discard_channel(channel)
+
+        if status != 'ok':
+            raise RuntimeError(f"Model server {method} failed: {result}")
+        return result
+
+    def detect_faces_batch(self, images: List, session_ids: Optional[List] = None) -> List[list]:
+        """Detect faces in several images (see EmotionDetector.detect_faces_batch)"""
+        session_ids = session_ids or [None] * len(images)
+        return self._call('detect_faces_batch', images, session_ids, frame_columns=(0,))
+
+    def classify_face_emotions(self, faces: List) -> List[dict]:
+        """Classify face crops (see EmotionDetector.classify_face_emotions)"""
+        return self._call('classify_face_emotions', faces, frame_columns=(0,))
+
+    def get_face_emotion_confidences(self, images: List, session_ids: Optional[List] = None) -> List[dict]:
+        """Emotion probabilities per image (see EmotionDetector.get_face_emotion_confidences)"""
+        session_ids = session_ids or [None] * len(images)
+        return self._call('get_face_emotion_confidences', images, session_ids, frame_columns=(0,))
+
+    def analyze_texts(self, texts: List[str]) -> list:
+        """Text emotion analyses (see EmotionDetector.analyze_texts)"""
+        return self._call('analyze_texts', texts)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Model load state on the server"""
+        return self._call('status')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching and cache statistics of the server"""
+        return self._call('stats')
+
+    def wait_for_model(self, name: str, timeout: float = 600.0, poll_interval: float = 0.5) -> str:
+        """
+        Block until the server has loaded a model.
+
+        Args:
+            name: Model name registered on the server
+            timeout: Seconds to wait for the server to come up and load the model
+            poll_interval: Seconds between status checks
+
+        Returns:
+            str: Final load state
+
+        Raises:
+            RuntimeError: If the model failed to load on the server
+            TimeoutError: If the model is not loaded within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                state = self.status()[name]
+            except RuntimeError:
+                # Server not up yet
+                state = None
+
+            if state is not None and state['state'] == ModelLoader.READY:
+                return state['state']
+            if state is not None and state['state'] == ModelLoader.FAILED:
+                raise RuntimeError(f"{name} failed to load on the model server: {state['error']}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                reason = 'not reachable' if state is None else f"still {state['state']}"
+                raise TimeoutError(f"{name} not loaded after {timeout}s: model server at {self.address} is {reason}")
+            time.sleep(min(poll_interval, remaining))
+
+def main():
+    # Fail before loading any model
+    authkey = get_authkey_from_env()
+    detector = EmotionDetector.from_env(
+        load_models=False,
+        inference_executor=create_inference_executor_from_env()
+    )
+
+    # Clients poll for readiness, so the server never loads lazily
+    model_loader = ModelLoader('eager' if os.getenv('MODEL_LOADING') == 'eager' else 'background')
+    executor = detector.inference_executor
+    if executor is not None:
+        model_loader.register('face_detector', executor.warm_up)
+        model_loader.register('face_emotion_model', executor.warm_up)
+    else:
+        model_loader.register('face_detector', detector.load_face_detection_model)
+        model_loader.register('face_emotion_model', detector.load_face_emotion_model)
+    model_loader.register('text_model', detector.load_text_emotion_model)
+    model_loader.start()
+
+    server = ModelServer(
+        detector,
+        model_loader,
+        authkey=authkey,
+        address=os.getenv('MODEL_SERVER_ADDRESS', DEFAULT_ADDRESS),
+        max_batch_size=int(os.getenv('FRAME_BATCH_SIZE', '16')),
+        max_wait_ms=float(os.getenv('FRAME_BATCH_WAIT_MS', '5'))
+    )
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Session Store Module
+Per-session state (current emotions, conversation log and conversation
+memory) keyed by session ID.
+
+InMemorySessionStore keeps sessions in the web process. SQLiteSessionStore
+keeps them in a SQLite file shared by every worker process on the node, so
+requests of one session can be served by any worker.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_SESSION = 'default'
+
+class SessionState:
+    """
+    State of one session.
+    """
+
+    __slots__ = ('session_id', 'face_emotion', 'text_emotion', 'conversation',
+                 'message_count', 'memory', 'updated_at')
+
+    def __init__(self, session_id: str, face_emotion: str = 'neutral', text_emotion: str = 'neutral',
+                 conversation: Optional[List[Dict[str, Any]]] = None, message_count: int = 0,
+                 memory: Optional[Dict[str, Any]] = None, updated_at: float = 0.0):
+        """
+        Initialize the state.
+
+        Args:
+            session_id: Session identifier
+            face_emotion: Latest facial emotion
+            text_emotion: Latest text emotion
+            conversation: Most recent conversation entries, oldest first
+            message_count: Messages exchanged in the session, including ones dropped from the log
+            memory: Serialized ConversationMemory
+            updated_at: Time of the last update
+        """
+        self.session_id = session_id
+        self.face_emotion = face_emotion
+        self.text_emotion = text_emotion
+        self.conversation = conversation if conversation is not None else []
+        self.message_count = message_count
+        self.memory = memory
+        self.updated_at = updated_at
+
+    @property
+    def emotions(self) -> Dict[str, str]:
+        """Current emotions in the shape returned by the API"""
+        return {'face_emotion': self.face_emotion, 'text_emotion': self.text_emotion}
+
+    def copy(self, include_conversation: bool = True) -> 'SessionState':
+        """
+        Copy that can be changed without affecting the stored state.
+        Conversation entries and the memory dict are shared: stores replace them
+        instead of changing them in place.
+
+        Args:
+            include_conversation: Copy the conversation log (left empty otherwise)
+
+        Returns:
+            SessionState: Copy of the state
+        """
+        return SessionState(
+            self.session_id, self.face_emotion, self.text_emotion,
+            list(self.conversation) if include_conversation else [],
+            self.message_count, self.memory, self.updated_at
+        )
+
+def append_message(state: SessionState, entry: Dict[str, Any], max_log_entries: int) -> int:
+    """
+    Add a conversation entry to a session, keeping the log bounded.
+
+    Args:
+        state: Session state to change
+        entry: Conversation entry
+        max_log_entries: Entries kept in the log
+
+    Returns:
+        int: Conversation ID of the entry
+    """
+    state.conversation.append(entry)
+    del state.conversation[:-max_log_entries]
+    state.message_count += 1
+    return state.message_count - 1
+
+class SessionStore(ABC):
+    """
+    Interface of the session stores.
+
+    Changes go through update(), which applies a function to the state
+    atomically, so concurrent requests of one session never lose each
+    other's changes.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str, include_conversation: bool = False) -> SessionState:
+        """
+        Get a copy of a session's state.
+
+        Args:
+            session_id: Session identifier
+            include_conversation: Also read the conversation log (left empty otherwise)
+
+        Returns:
+            SessionState: Stored state, or a fresh state if the session is unknown
+        """
+
+    @abstractmethod
+    def update(self, session_id: str, change: Callable[[SessionState], Any]) -> Any:
+        """
+        Change a session's state atomically, creating the session if needed.
+
+        Args:
+            session_id: Session identifier
+            change: Function changing the state in place
+
+        Returns:
+            Return value of change
+        """
+
+    @abstractmethod
+    def set_face_emotion(self, session_id: str, face_emotion: str):
+        """
+        Record the latest facial emotion of a session, creating the session if needed.
+        Called for every analyzed frame, so it must not touch the rest of the state.
+
+        Args:
+            session_id: Session identifier
+            face_emotion: Detected facial emotion
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """
+        Forget a session.
+
+        Args:
+            session_id: Session identifier
+        """
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            dict: Backend, stored sessions and evictions
+        """
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sessions kept in the current process, least recently used evicted first.
+    Only suitable for a single worker process.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Maximum number of sessions kept
+            ttl: Seconds an idle session is kept (None = until evicted)
+        """
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _lookup(self, session_id: str) -> Optional[SessionState]:
+        """Find a live session, dropping it if it expired (lock held)"""
+        state = self._sessions.get(session_id)
+        if state is not None and self.ttl and time.time() - state.updated_at > self.ttl:
+            del self._sessions[session_id]
+            self.evictions += 1
+            state = None
+        return state
+
+    def get(self, session_id: str, include_conversation: bool = False) -> SessionState:
+        with self._lock:
+            state = self._lookup(session_id)
+            if state is None:
+                return SessionState(session_id)
+            self._sessions.move_to_end(session_id)
+            return state.copy(include_conversation)
+
+    def _get_or_create(self, session_id: str) -> SessionState:
+        """Find or create a session and mark it most recently used (lock held)"""
+        state = self._lookup(session_id)
+        if state is None:
+            state = SessionState(session_id)
+            self._sessions[session_id] = state
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        return state
+
+    def update(self, session_id: str, change: Callable[[SessionState], Any]) -> Any:
+        with self._lock:
+            state = self._get_or_create(session_id)
+            result = change(state)
+            state.updated_at = time.time()
+            return result
+
+    def set_face_emotion(self, session_id: str, face_emotion: str):
+        with self._lock:
+            state = self._get_or_create(session_id)
+            state.face_emotion = face_emotion
+            state.updated_at = time.time()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'evictions': self.evictions
+            }
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions kept in a SQLite file shared by all worker processes on a node.
+
+    Emotions, the conversation log and the memory are separate columns, so
+    the per-frame face emotion write is a single small upsert. update() runs
+    in an IMMEDIATE transaction, which serializes writers across processes.
+    """
+
+    # Columns holding JSON, in addition to the plain SessionState fields
+    JSON_COLUMNS = ('conversation', 'memory')
+
+    def __init__(self, path: str, max_sessions: int = 10000, ttl: Optional[float] = None,
+                 prune_interval: float = 60.0, max_connections: int = 4, touch_interval: float = 60.0):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite file
+            max_sessions: Maximum number of sessions kept; least recently updated are dropped
+            ttl: Seconds an idle session is kept (None = until evicted)
+            prune_interval: Minimum seconds between removals of expired and excess sessions
+            max_connections: Connections kept open for concurrent requests
+            touch_interval: Seconds between updated_at refreshes while the face emotion is unchanged
+        """
+        self.path = path
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self.touch_interval = touch_interval
+        self.evictions = 0
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+        self._connections = queue.Queue()
+        for _ in range(max(1, int(max_connections))):
+            self._connections.put(self._connect())
+
+        with self._connection() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS session_state ('
+                'session_id TEXT PRIMARY KEY, '
+                "face_emotion TEXT NOT NULL DEFAULT 'neutral', "
+                "text_emotion TEXT NOT NULL DEFAULT 'neutral', "
+                "conversation TEXT NOT NULL DEFAULT '[]', "
+                'message_count INTEGER NOT NULL DEFAULT 0, '
+                'memory TEXT, '
+                'updated_at REAL NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS session_state_updated_at ON session_state (updated_at)')
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open one connection; transactions are managed explicitly"""
+        # The timeout covers other processes holding the write lock
+        db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool"""
+        db = self._connections.get()
+        try:
+            yield db
+        finally:
+            self._connections.put(db)
+
+    def _load(self, db: sqlite3.Connection, session_id: str,
+              include_conversation: bool = True) -> Optional[SessionState]:
+        """Read a live session"""
+        columns = ['face_emotion', 'text_emotion', 'message_count', 'memory', 'updated_at']
+        if include_conversation:
+            columns.append('conversation')
+        row = db.execute(
+            f'SELECT {", ".join(columns)} FROM session_state WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        values = dict(zip(columns, row))
+        if self.ttl and time.time() - values['updated_at'] > self.ttl:
+            return None
+        for column in self.JSON_COLUMNS:
+            if values.get(column) is not None:
+                values[column] = json.loads(values[column])
+        return SessionState(session_id, **values)
+
+    def get(self, session_id: str, include_conversation: bool = False) -> SessionState:
+        with self._connection() as db:
+            state = self._load(db, session_id, include_conversation)
+        return state if state is not None else SessionState(session_id)
+
+    def update(self, session_id: str, change: Callable[[SessionState], Any]) -> Any:
+        with self._connection() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                state = self._load(db, session_id) or SessionState(session_id)
+                result = change(state)
+                state.updated_at = time.time()
+                db.execute(
+                    'INSERT OR REPLACE INTO session_state (session_id, face_emotion, text_emotion, '
+                    'conversation, message_count, memory, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        session_id, state.face_emotion, state.text_emotion,
+                        json.dumps(state.conversation), state.message_count,
+                        json.dumps(state.memory) if state.memory is not None else None,
+                        state.updated_at
+                    )
+                )
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            self._prune(db)
+        return result
+
+    def set_face_emotion(self, session_id: str, face_emotion: str):
+        now = time.time()
+        with self._connection() as db:
+            # Unchanged labels only refresh updated_at every touch_interval seconds
+            db.execute(
+                'INSERT INTO session_state (session_id, face_emotion, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (session_id) DO UPDATE SET '
+                'face_emotion = excluded.face_emotion, updated_at = excluded.updated_at '
+                'WHERE face_emotion != excluded.face_emotion OR updated_at < ?',
+                (session_id, face_emotion, now, now - self.touch_interval)
+            )
+
+    def _prune(self, db: sqlite3.Connection):
+        """Remove expired and excess sessions every prune_interval seconds"""
+        now = time.time()
+        with self._prune_lock:
+            if now - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = now
+        try:
+            removed = 0
+            if self.ttl:
+                removed += db.execute(
+                    'DELETE FROM session_state WHERE updated_at < ?', (now - self.ttl,)
+                ).rowcount
+            removed += db.execute(
+                'DELETE FROM session_state WHERE session_id NOT IN '
+                '(SELECT session_id FROM session_state ORDER BY updated_at DESC LIMIT ?)',
+                (self.max_sessions,)
+            ).rowcount
+            self.evictions += removed
+        except sqlite3.Error as e:
+            print(f"Warning: Could not prune session store: {e}")
+
+    def delete(self, session_id: str):
+        with self._connection() as db:
+            db.execute('DELETE FROM session_state WHERE session_id = ?', (session_id,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._connection() as db:
+            sessions = db.execute('SELECT COUNT(*) FROM session_state').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'sessions': sessions,
+            'max_sessions': self.max_sessions,
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        """Close the pooled connections"""
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+def create_session_store_from_env() -> SessionStore:
+    """
+    Create the store configured by SESSION_STORE, SESSION_STORE_PATH,
+    SESSION_MAX and SESSION_TTL.
+
+    Returns:
+        SessionStore: Session store
+    """
+    backend = os.getenv('SESSION_STORE', 'memory')
+    max_sessions = int(os.getenv('SESSION_MAX', '10000'))
+    ttl = float(os.getenv('SESSION_TTL', '86400')) or None
+    if backend == 'memory':
+        return InMemorySessionStore(max_sessions=max_sessions, ttl=ttl)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(
+            os.getenv('SESSION_STORE_PATH', 'sessions.db'),
+            max_sessions=max_sessions,
+            ttl=ttl
+        )
+    raise ValueError(f"Unknown session store: {backend}")
@@ -0,0 +1,140 @@
+"""
+Shared Frame Buffers Module
+Passes batches of video frames between processes through POSIX shared memory
+instead of pickling the pixel data over a socket or pipe.
+The writer packs frames into one reusable block and sends only a small
+descriptor; the reader maps the same block and wraps it in numpy views.
+"""
+
+import threading
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without handing it to this process's resource tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block, which would unlink it when this process exits
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(block._name, 'shared_memory')
+        except Exception:
+            pass
+        return block
+
+class SharedFrameBuffer:
+    """
+    Writer side: one growable shared memory block reused for every batch.
+    Not thread-safe; use one buffer per connection or worker.
+    """
+
+    def __init__(self, initial_size: int = 4 * 1024 * 1024):
+        """
+        Initialize the buffer.
+
+        Args:
+            initial_size: Bytes allocated for the first batch
+        """
+        self.initial_size = initial_size
+        self._block = None
+
+    def _ensure_capacity(self, size: int):
+        """Replace the block with a larger one if the batch does not fit"""
+        if self._block is not None and self._block.size >= size:
+            return
+        capacity = max(size, self.initial_size, 2 * self._block.size if self._block is not None else 0)
+        self.close()
+        self._block = shared_memory.SharedMemory(create=True, size=capacity)
+
+    def write(self, frames: List[np.ndarray]) -> Tuple[str, list]:
+        """
+        Copy frames into shared memory.
+
+        Args:
+            frames: Images to share
+
+        Returns:
+            tuple: (block name, [(offset, shape, dtype), ...]) descriptor for read_frames
+        """
+        frames = [np.ascontiguousarray(frame) for frame in frames]
+        self._ensure_capacity(sum(frame.nbytes for frame in frames))
+
+        layout = []
+        offset = 0
+        for frame in frames:
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._block.buf, offset=offset)
+            view[...] = frame
+            layout.append((offset, frame.shape, frame.dtype.str))
+            offset += frame.nbytes
+
+        return self._block.name, layout
+
+    def close(self):
+        """Release and unlink the block"""
+        if self._block is not None:
+            try:
+                self._block.close()
+                self._block.unlink()
+            except Exception as e:
+                print(f"Warning: Could not release shared frame buffer: {e}")
+            self._block = None
+
+class SharedFrameReader:
+    """
+    Reader side: keeps the most recently used blocks mapped between batches.
+    """
+
+    def __init__(self, max_blocks: int = 64):
+        """
+        Initialize the reader.
+
+        Args:
+            max_blocks: Maximum number of blocks kept mapped
+        """
+        self.max_blocks = max_blocks
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def read(self, descriptor: Tuple[str, list]) -> List[np.ndarray]:
+        """
+        Map frames written by a SharedFrameBuffer.
+        The views are only valid until the writer sends its next batch.
+
+        Args:
+            descriptor: Value returned by SharedFrameBuffer.write
+
+        Returns:
+            list: Numpy views onto the shared frames
+        """
+        name, layout = descriptor
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None:
+                block = _attach(name)
+                self._blocks[name] = block
+                while len(self._blocks) > self.max_blocks:
+                    self._release(next(iter(self._blocks)))
+
+        return [
+            np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+            for offset, shape, dtype in layout
+        ]
+
+    def _release(self, name: str):
+        """Unmap one block (its writer is responsible for unlinking it)"""
+        block = self._blocks.pop(name)
+        try:
+            block.close()
+        except BufferError:
+            # A view is still alive; the mapping is freed with it
+            pass
+
+    def close(self):
+        """Unmap every block"""
+        with self._lock:
+            for name in list(self._blocks):
+                self._release(name)
@@ -0,0 +1,87 @@
+"""
+Frame endpoint tests: the per-request denoise option on every frame entry point.
+"""
+
+import base64
+
+import pytest
+
+for module in ('flask', 'flask_cors', 'flask_socketio', 'requests'):
+    pytest.importorskip(module)
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """app.py wired to stub face models, with nothing loaded in the background"""
+    monkeypatch.setenv('MODEL_LOADING', 'lazy')
+    monkeypatch.setenv('PREPROCESS_SCOPE', 'frame')
+    import app
+    from benchmark import StubEmotionModel, StubFaceDetector
+    from emotion_detector import EmotionDetector
+    from micro_batcher import MicroBatcher
+
+    detector = EmotionDetector(
+        face_detector=StubFaceDetector(), face_emotion_model=StubEmotionModel(), load_text_model=False
+    )
+    batcher = MicroBatcher(detector.get_face_emotion_confidences, max_wait_ms=1.0, name='test-frame-batcher')
+    monkeypatch.setattr(app, 'frame_batcher', batcher)
+    monkeypatch.setattr(app.model_loader, 'wait', lambda names, timeout=None: True)
+    yield app
+    batcher.stop()
+
+def encode(frame):
+    ok, encoded = cv2.imencode('.jpg', frame)
+    assert ok
+    return encoded.tobytes()
+
+def data_url(frame):
+    return 'data:image/jpeg;base64,' + base64.b64encode(encode(frame)).decode('ascii')
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+
+def test_single_frame_reports_denoise(app_module, frame):
+    response = app_module.app.test_client().post('/api/process_frame', json={
+        'frame': data_url(frame), 'denoise': 'median'
+    })
+    assert response.status_code == 200
+    assert response.get_json()['denoise'] == 'median'
+
+def test_batch_accepts_and_reports_denoise(app_module, frame):
+    client = app_module.app.test_client()
+
+    response = client.post('/api/process_frames', json={
+        'frames': [data_url(frame), 'data:image/jpeg;base64,AAAA', data_url(frame)],
+        'denoise': 'adaptive'
+    })
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results[1] == {'error': 'Invalid image data'}
+    # Adaptive resolves to the stage it picked for each frame
+    for result in (results[0], results[2]):
+        assert result['denoise'] not in (None, 'adaptive')
+
+    response = client.post('/api/process_frames', json={'frames': [data_url(frame)]})
+    assert response.get_json()['results'][0]['denoise'] == app_module.image_preprocessor.denoise_method.value
+
+@pytest.mark.parametrize('endpoint, payload', [
+    ('/api/process_frame', {'frame': 'data:image/jpeg;base64,AAAA'}),
+    ('/api/process_frames', {'frames': ['data:image/jpeg;base64,AAAA']})
+])
+def test_unknown_denoise_is_rejected(app_module, endpoint, payload):
+    response = app_module.app.test_client().post(endpoint, json=dict(payload, denoise='sharpen'))
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown denoise method: sharpen'}
+
+def test_socket_frame_accepts_and_reports_denoise(app_module, frame):
+    client = app_module.socketio.test_client(app_module.app)
+
+    client.emit('frame', {'frame': encode(frame), 'denoise': 'gaussian'})
+    client.emit('frame', {'frame': encode(frame), 'denoise': 'sharpen'})
+    results = [event['args'][0] for event in client.get_received() if event['name'] == 'frame_result']
+
+    assert results[0]['denoise'] == 'gaussian'
+    assert results[1] == {'error': 'Unknown denoise method: sharpen'}
+    client.disconnect()
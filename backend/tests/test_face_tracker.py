@@ -0,0 +1,50 @@
+"""
+Face tracker tests: tracked boxes must follow a moving face without drifting.
+"""
+
+import os
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+
+from face_tracker import FaceTracker
+
+SAMPLE_IMAGE = os.path.join(os.path.dirname(__file__), '..', '..', 'rose.jpeg')
+
+def shift(image, dx, dy):
+    """Translate an image by whole pixels"""
+    height, width = image.shape[:2]
+    matrix = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(image, matrix, (width, height), borderMode=cv2.BORDER_REFLECT)
+
+@pytest.fixture
+def image():
+    image = cv2.imread(SAMPLE_IMAGE)
+    if image is None:
+        pytest.skip("rose.jpeg not available")
+    return image
+
+@pytest.mark.parametrize('step', [(1, 0), (1, 1), (3, -2), (-6, 4)])
+def test_tracking_does_not_drift(image, step):
+    height, width = image.shape[:2]
+    x, y = width // 2 - 90, height // 3 - 90
+    bbox = (x, y, x + 180, y + 180)
+
+    tracker = FaceTracker(redetect_interval=100)
+    tracker.update(image, [{'bbox': bbox, 'confidence': 0.9}])
+
+    for frame in range(1, 13):
+        dx, dy = step[0] * frame, step[1] * frame
+        faces = tracker.track(shift(image, dx, dy))
+        assert faces is not None
+        tracked_x, tracked_y = faces[0]['bbox'][:2]
+        assert abs(tracked_x - (x + dx)) <= 1
+        assert abs(tracked_y - (y + dy)) <= 1
+
+def test_redetection_interval(image):
+    tracker = FaceTracker(redetect_interval=3)
+    tracker.update(image, [{'bbox': (100, 100, 280, 280), 'confidence': 0.9}])
+
+    assert [tracker.track(image) is not None for _ in range(4)] == [True, True, True, False]
@@ -0,0 +1,129 @@
+"""
+Gemini client tests against the local Gemini stub: hedged fallbacks, the
+circuit breaker, the response cache and replies without candidates.
+"""
+
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+from circuit_breaker import CircuitBreaker
+from gemini_client import FALLBACK_RESPONSES, GeminiClient
+from gemini_stub import StubState, make_handler
+
+@pytest.fixture
+def stub():
+    """Gemini stub on a free local port"""
+    state = StubState(chunk_delay=0.0)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    state.api_base = f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def create_client(stub, **options):
+    """Client pointed at the stub, with a breaker that opens after 4 failed calls"""
+    options.setdefault('breaker', CircuitBreaker(
+        failure_rate_threshold=0.5, window_size=4, min_calls=4, open_duration=0.5, name='test'
+    ))
+    options.setdefault('latency_budget', 2.0)
+    return GeminiClient(api_key='stub', api_base=stub.api_base, timeout=5.0, **options)
+
+def wait_for(condition, timeout=5.0):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+def test_response_from_stub_is_cached(stub):
+    client = create_client(stub)
+
+    first = client.get_response('sad', 'sadness', 'I feel low')
+    second = client.get_response('sad', 'sadness', 'I feel low')
+
+    assert first == second == "I hear you. You said: I feel low"
+    assert stub.requests == {'generateContent': 1}
+    assert client.breaker.get_stats()['failure_rate'] == 0.0
+
+def test_hedged_fallback_within_latency_budget(stub):
+    stub.delay = 1.0
+    client = create_client(stub, latency_budget=0.2)
+
+    start = time.monotonic()
+    response = client.get_response('sad', 'sadness', 'Nobody listens to me')
+    elapsed = time.monotonic() - start
+
+    assert response == FALLBACK_RESPONSES['sad']
+    assert elapsed < 0.5
+    assert client.hedged_responses == 1
+
+def test_late_completion_fills_cache(stub):
+    stub.delay = 0.5
+    client = create_client(stub, latency_budget=0.1)
+
+    assert client.get_response('fear', 'fear', 'I am worried') == FALLBACK_RESPONSES['fear']
+    assert wait_for(lambda: client.get_cache_stats()['size'] == 1)
+
+    # The next identical message is answered from the cache, however slow the API is now
+    stub.delay = 5.0
+    start = time.monotonic()
+    assert client.get_response('fear', 'fear', 'I am worried') == "I hear you. You said: I am worried"
+    assert time.monotonic() - start < 0.5
+
+def test_breaker_opens_and_half_opens(stub):
+    stub.error_rate = 1.0
+    client = create_client(stub, cache_size=0)
+
+    for i in range(4):
+        assert client.get_response('sad', 'sadness', f"message {i}") == FALLBACK_RESPONSES['sad']
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    # Open: answered right away without calling the API
+    assert client.get_response('sad', 'sadness', 'message 4') == FALLBACK_RESPONSES['sad']
+    assert stub.requests == {'errors': 4}
+    assert client.rejected_responses == 1
+
+    # After the cooldown one probe goes through and closes the breaker
+    time.sleep(0.6)
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    stub.error_rate = 0.0
+    assert client.get_response('sad', 'sadness', 'message 5') == "I hear you. You said: message 5"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+def test_reply_without_candidates_is_a_failure(stub):
+    stub.block_rate = 1.0
+    client = create_client(stub)
+
+    assert client.get_response('angry', 'anger', 'Everything is wrong') == FALLBACK_RESPONSES['angry']
+    assert client.get_cache_stats()['size'] == 0
+    breaker = client.breaker.get_stats()
+    assert breaker['window_calls'] == 1 and breaker['failure_rate'] == 1.0
+
+def test_streamed_reply_without_candidates_is_a_failure(stub):
+    stub.block_rate = 1.0
+    client = create_client(stub)
+
+    chunks = list(client.stream_response('angry', 'anger', 'Everything is wrong'))
+
+    assert chunks == [FALLBACK_RESPONSES['angry']]
+    assert client.get_cache_stats()['size'] == 0
+    assert client.breaker.get_stats()['failure_rate'] == 1.0
+
+def test_streamed_reply_is_cached(stub):
+    client = create_client(stub)
+
+    chunks = list(client.stream_response('happy', 'joy', 'I got the job'))
+
+    assert ''.join(chunks) == "I hear you. You said: I got the job"
+    assert len(chunks) > 1
+    assert list(client.stream_response('happy', 'joy', 'I got the job')) == [''.join(chunks)]
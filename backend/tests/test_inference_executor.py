@@ -0,0 +1,86 @@
+"""
+Inference executor tests: spawned workers must not re-run the module-level
+setup of the script that started them.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Launch script shaped like app.py: wiring at import time, behind the same guard
+ENTRY_MODULE = textwrap.dedent('''
+    import multiprocessing
+    import os
+
+    import numpy as np
+
+    from inference_executor import InferenceExecutor
+
+    def create_stub_detector():
+        from benchmark import StubEmotionModel, StubFaceDetector
+        from emotion_detector import EmotionDetector
+        return EmotionDetector(
+            face_detector=StubFaceDetector(),
+            face_emotion_model=StubEmotionModel(),
+            load_text_model=False
+        )
+
+    executor = None
+    if __name__ != '__mp_main__' and multiprocessing.parent_process() is None:
+        print('wiring', os.getpid(), flush=True)
+        executor = InferenceExecutor(workers=2, min_chunk_size=1, detector_factory=create_stub_detector)
+
+    if __name__ == '__main__':
+        statuses = executor.warm_up()
+        frames = [np.full((120, 160, 3), 40 * i, dtype=np.uint8) for i in range(4)]
+        detections = executor.run('detect_faces', frames, 0.5)
+        print('workers', len(statuses), flush=True)
+        print('detections', [len(faces) for faces in detections], flush=True)
+        executor.shutdown()
+''')
+
+def run_entry_module(tmp_path, source, **env):
+    """Run source as the launch script, with the backend importable"""
+    script = tmp_path / 'entry.py'
+    script.write_text(source)
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **env)
+    return subprocess.run(
+        [sys.executable, str(script)], cwd=str(tmp_path), env=env,
+        capture_output=True, text=True, timeout=120
+    )
+
+def test_workers_do_not_rerun_entry_module_setup(tmp_path):
+    pytest.importorskip('cv2')
+    result = run_entry_module(tmp_path, ENTRY_MODULE)
+    assert result.returncode == 0, result.stderr
+
+    lines = result.stdout.splitlines()
+    assert len([line for line in lines if line.startswith('wiring')]) == 1
+    assert 'workers 2' in lines
+    assert 'detections [1, 1, 1, 1]' in lines
+
+def test_app_builds_components_only_in_serving_process(tmp_path):
+    for module in ('flask', 'flask_cors', 'flask_socketio', 'requests'):
+        pytest.importorskip(module)
+
+    # Import app inside a spawned child, the way an inference worker does
+    source = textwrap.dedent('''
+        import multiprocessing
+
+        def report():
+            import app
+            print('child', app.emotion_detector is None, app.model_loader is None, flush=True)
+
+        if __name__ == '__main__':
+            process = multiprocessing.get_context('spawn').Process(target=report)
+            process.start()
+            process.join(60)
+    ''')
+    result = run_entry_module(tmp_path, source, MODEL_LOADING='lazy')
+    assert result.returncode == 0, result.stderr
+    assert 'child True True' in result.stdout.splitlines()
@@ -0,0 +1,126 @@
+"""
+LRU cache tests: eviction, expiry and the SQLite backing.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from lru_cache import LRUCache
+
+def stored_keys(path, table='cache'):
+    """Keys currently in the SQLite file"""
+    with sqlite3.connect(path) as db:
+        return {row[0] for row in db.execute(f'SELECT key FROM "{table}"')}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.get_stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache(ttl=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+
+    time.sleep(0.1)
+    assert cache.get('a', 'missing') == 'missing'
+    assert len(cache) == 0
+
+def test_writes_are_committed_in_batches(path):
+    cache = LRUCache(persist_path=path, flush_interval=60.0)
+    for i in range(10):
+        cache.set(f'k{i}', {'value': i})
+
+    # Nothing is written on the request path
+    assert stored_keys(path) == set()
+
+    cache.flush()
+    assert stored_keys(path) == {f'k{i}' for i in range(10)}
+
+def test_writer_thread_flushes_without_an_explicit_flush(path):
+    cache = LRUCache(persist_path=path, flush_interval=0.05)
+    cache.set('a', 1)
+    deadline = time.monotonic() + 5.0
+    while stored_keys(path) != {'a'} and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert stored_keys(path) == {'a'}
+
+def test_many_pending_writes_flush_before_the_interval(path):
+    cache = LRUCache(persist_path=path, flush_interval=60.0, max_pending=5)
+    for i in range(5):
+        cache.set(f'k{i}', i)
+
+    deadline = time.monotonic() + 5.0
+    while len(stored_keys(path)) < 5 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(stored_keys(path)) == 5
+
+def test_evicted_keys_are_deleted_from_the_store(path):
+    cache = LRUCache(max_size=3, persist_path=path, flush_interval=60.0)
+    for i in range(3):
+        cache.set(f'k{i}', i)
+    cache.flush()
+    for i in range(3, 6):
+        cache.set(f'k{i}', i)
+    cache.flush()
+
+    assert stored_keys(path) == {'k3', 'k4', 'k5'}
+
+def test_expired_keys_are_deleted_from_the_store(path):
+    cache = LRUCache(ttl=0.05, persist_path=path, flush_interval=60.0)
+    cache.set('a', 1)
+    cache.flush()
+    time.sleep(0.1)
+
+    assert cache.get('a') is None
+    cache.flush()
+    assert stored_keys(path) == set()
+
+def test_restart_warms_the_cache(path):
+    cache = LRUCache(max_size=3, persist_path=path, flush_interval=60.0)
+    for i in range(3):
+        cache.set(f'k{i}', {'value': i})
+    cache.flush()
+
+    restarted = LRUCache(max_size=2, persist_path=path)
+
+    # Only the most recently written entries fit
+    assert len(restarted) == 2
+    assert restarted.get('k2') == {'value': 2}
+    assert restarted.get('k1') == {'value': 1}
+    assert restarted.get('k0') is None
+    assert stored_keys(path) == {'k1', 'k2'}
+
+def test_restart_drops_expired_entries(path):
+    cache = LRUCache(ttl=0.05, persist_path=path, flush_interval=60.0)
+    cache.set('a', 1)
+    cache.flush()
+    time.sleep(0.1)
+
+    restarted = LRUCache(ttl=0.05, persist_path=path)
+    assert len(restarted) == 0
+    assert stored_keys(path) == set()
+
+def test_clear_empties_memory_pending_writes_and_store(path):
+    cache = LRUCache(persist_path=path, flush_interval=60.0)
+    cache.set('a', 1)
+    cache.flush()
+    cache.set('b', 2)
+
+    cache.clear()
+    cache.flush()
+    assert len(cache) == 0
+    assert stored_keys(path) == set()
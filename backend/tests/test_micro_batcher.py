@@ -0,0 +1,111 @@
+"""
+Micro-batcher tests: batching by size and by time, error propagation and shutdown.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+class RecordingBatchFn:
+    """Batch function doubling its inputs and recording the batch sizes"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+        self.started = threading.Event()
+
+    def __call__(self, values):
+        self.started.set()
+        self.batch_sizes.append(len(values))
+        time.sleep(self.delay)
+        return [value * 2 for value in values]
+
+def test_results_match_their_items():
+    batcher = MicroBatcher(RecordingBatchFn(), max_batch_size=4, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda value: batcher.submit(value, timeout=5), range(50)))
+
+    assert results == [value * 2 for value in range(50)]
+    batcher.stop()
+
+def test_full_batch_runs_without_waiting_for_the_window():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=10000)
+
+    start = time.monotonic()
+    futures = [batcher.submit_async(value) for value in range(4)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+    assert time.monotonic() - start < 1.0
+    assert batch_fn.batch_sizes == [4]
+    batcher.stop()
+
+def test_batches_split_at_max_batch_size():
+    batch_fn = RecordingBatchFn(delay=0.05)
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+
+    # Hold the worker in a batch so the next items queue up together
+    first = batcher.submit_async(0)
+    assert batch_fn.started.wait(5)
+    futures = [batcher.submit_async(value) for value in range(1, 11)]
+    for future in [first] + futures:
+        future.result(timeout=5)
+
+    assert batch_fn.batch_sizes == [1, 4, 4, 2]
+    assert batcher.get_stats()['items_processed'] == 11
+    batcher.stop()
+
+def test_partial_batch_runs_when_the_window_closes():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=50)
+
+    start = time.monotonic()
+    futures = [batcher.submit_async(value) for value in range(3)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4]
+    elapsed = time.monotonic() - start
+
+    assert batch_fn.batch_sizes == [3]
+    assert 0.04 <= elapsed < 1.0
+    batcher.stop()
+
+def test_batch_function_errors_reach_every_caller_of_the_batch():
+    def fail(values):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit_async(value) for value in range(3)]
+
+    for future in futures:
+        with pytest.raises(ValueError, match="model failed"):
+            future.result(timeout=5)
+    with pytest.raises(ValueError):
+        batcher.submit(1, timeout=5)
+
+    # The worker keeps running after a failed batch
+    batcher.batch_fn = RecordingBatchFn()
+    assert batcher.submit(1, timeout=5) == 2
+    batcher.stop()
+
+def test_wrong_number_of_results_is_an_error():
+    batcher = MicroBatcher(lambda values: values[:-1], max_batch_size=2, max_wait_ms=50)
+    futures = [batcher.submit_async(value) for value in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+            future.result(timeout=5)
+    batcher.stop()
+
+def test_stop_processes_pending_items_then_rejects_new_ones():
+    batch_fn = RecordingBatchFn(delay=0.05)
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+    futures = [batcher.submit_async(value) for value in range(5)]
+
+    batcher.stop(timeout=5)
+
+    assert not batcher._worker.is_alive()
+    assert [future.result(timeout=0) for future in futures] == [0, 2, 4, 6, 8]
+    with pytest.raises(RuntimeError, match="stopped"):
+        batcher.submit_async(1)
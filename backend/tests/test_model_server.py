@@ -0,0 +1,64 @@
+"""
+Model server tests: shared face models and client startup waits.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from benchmark import StubEmotionModel, StubFaceDetector
+from emotion_detector import EmotionDetector
+from model_loader import ModelLoader
+from model_server import ModelClient, ModelServer
+
+AUTHKEY = 'test-model-server-key'
+
+class RacyFaceDetector(StubFaceDetector):
+    """Stub net that notices when another thread calls setInput before forward"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.overlaps = 0
+
+    def setInput(self, blob):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        super().setInput(blob)
+        time.sleep(0.002)
+
+    def forward(self):
+        try:
+            return super().forward()
+        finally:
+            self.active -= 1
+
+def test_face_batchers_do_not_share_the_net_concurrently():
+    net = RacyFaceDetector()
+    detector = EmotionDetector(face_detector=net, face_emotion_model=StubEmotionModel(), load_text_model=False)
+    server = ModelServer(detector, ModelLoader('lazy'), authkey=AUTHKEY, max_wait_ms=1.0)
+    frame = np.full((120, 160, 3), 128, dtype=np.uint8)
+
+    def request(i):
+        method = 'detect_faces_batch' if i % 2 else 'get_face_emotion_confidences'
+        return server.batchers[method].submit(frame, None, timeout=10)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(request, range(64)))
+
+    assert net.overlaps == 0
+    assert all(results)
+
+def test_wait_for_model_times_out_when_server_is_down(tmp_path):
+    client = ModelClient(AUTHKEY, address=str(tmp_path / 'missing.sock'), timeout=0.5)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        client.wait_for_model('face_detector', timeout=0.3, poll_interval=0.05)
+    assert time.monotonic() - start < 2.0
@@ -0,0 +1,178 @@
+"""
+Session store tests: atomic updates, pruning, face emotion writes and
+conversation memory round trips for both stores.
+"""
+
+import threading
+import time
+
+import pytest
+
+from conversation_memory import ConversationMemory
+from session_store import InMemorySessionStore, SQLiteSessionStore, append_message
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        yield InMemorySessionStore()
+    else:
+        store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+        yield store
+        store.close()
+
+def test_unknown_session_is_fresh(store):
+    state = store.get('nobody')
+    assert state.emotions == {'face_emotion': 'neutral', 'text_emotion': 'neutral'}
+    assert state.message_count == 0
+
+def test_concurrent_updates_are_not_lost(store):
+    def add_messages(worker):
+        for i in range(25):
+            store.update('shared', lambda state: append_message(
+                state, {'user_message': f"{worker}-{i}"}, max_log_entries=1000
+            ))
+
+    threads = [threading.Thread(target=add_messages, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    state = store.get('shared', include_conversation=True)
+    assert state.message_count == 200
+    assert len({entry['user_message'] for entry in state.conversation}) == 200
+
+def test_update_returns_result_and_rolls_back_on_error(store):
+    store.update('s', lambda state: setattr(state, 'text_emotion', 'joy'))
+
+    def fail(state):
+        state.text_emotion = 'anger'
+        raise ValueError("change failed")
+
+    with pytest.raises(ValueError):
+        store.update('s', fail)
+
+    if isinstance(store, SQLiteSessionStore):
+        # The in-memory store changes its state in place, so only SQLite can roll back
+        assert store.get('s').text_emotion == 'joy'
+    assert store.update('s', lambda state: append_message(state, {}, 10)) == 0
+
+def test_get_leaves_out_conversation_unless_asked(store):
+    store.update('s', lambda state: append_message(state, {'user_message': 'hi'}, 10))
+
+    assert store.get('s').conversation == []
+    assert store.get('s', include_conversation=True).conversation == [{'user_message': 'hi'}]
+
+def test_get_returns_a_copy(store):
+    store.update('s', lambda state: append_message(state, {'user_message': 'hi'}, 10))
+
+    state = store.get('s', include_conversation=True)
+    state.conversation.append({'user_message': 'not stored'})
+    state.face_emotion = 'angry'
+
+    stored = store.get('s', include_conversation=True)
+    assert len(stored.conversation) == 1
+    assert stored.face_emotion == 'neutral'
+
+def test_set_face_emotion_keeps_the_rest_of_the_state(store):
+    store.update('s', lambda state: append_message(state, {'user_message': 'hi'}, 10))
+    store.set_face_emotion('s', 'happy')
+    store.set_face_emotion('new', 'sad')
+
+    state = store.get('s', include_conversation=True)
+    assert state.face_emotion == 'happy'
+    assert state.message_count == 1 and len(state.conversation) == 1
+    assert store.get('new').face_emotion == 'sad'
+
+def test_memory_round_trips_through_store(store):
+    options = {'max_turns': 2}
+
+    def record(user_message, ai_response, emotion):
+        def change(state):
+            memory = ConversationMemory.from_dict(state.memory, **options)
+            memory.add_turn(user_message, ai_response, emotion)
+            state.memory = memory.to_dict()
+        store.update('s', change)
+
+    record("I failed my exam. It was the hardest one.", "That sounds painful.", 'sadness')
+    record("My friend cancelled on me.", "That must have hurt.", 'sadness')
+    record("Now I am a bit better.", "I'm glad to hear that.", 'relief')
+
+    restored = ConversationMemory.from_dict(store.get('s').memory, **options)
+    expected = ConversationMemory(**options)
+    expected.add_turn("I failed my exam. It was the hardest one.", "That sounds painful.", 'sadness')
+    expected.add_turn("My friend cancelled on me.", "That must have hurt.", 'sadness')
+    expected.add_turn("Now I am a bit better.", "I'm glad to hear that.", 'relief')
+
+    assert restored.to_dict() == expected.to_dict()
+    assert restored.get_context() == expected.get_context()
+    assert 'I failed my exam.' in restored.get_context()['summary']
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2)
+    store.set_face_emotion('a', 'happy')
+    store.set_face_emotion('b', 'sad')
+    store.get('a')
+    store.set_face_emotion('c', 'angry')
+
+    assert store.get('a').face_emotion == 'happy'
+    assert store.get('b').face_emotion == 'neutral'
+    assert store.get_stats()['evictions'] == 1
+
+def test_memory_store_expires_idle_sessions():
+    store = InMemorySessionStore(ttl=0.05)
+    store.set_face_emotion('a', 'happy')
+    time.sleep(0.1)
+
+    assert store.get('a').face_emotion == 'neutral'
+    assert store.get_stats()['sessions'] == 0
+
+def test_sqlite_store_prunes_excess_and_expired_sessions(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), max_sessions=3, ttl=0.3, prune_interval=0)
+    for session_id in ('a', 'b', 'c', 'd'):
+        store.update(session_id, lambda state: None)
+        time.sleep(0.01)
+
+    # The least recently updated session went over max_sessions
+    assert store.get_stats()['sessions'] == 3
+    assert store.get('a').updated_at == 0.0
+
+    time.sleep(0.35)
+    assert store.get('d').updated_at == 0.0
+    store.update('e', lambda state: None)
+    assert store.get_stats()['sessions'] == 1
+    assert store.get_stats()['evictions'] == 4
+    store.close()
+
+def test_sqlite_face_emotion_touches_updated_at_only_every_touch_interval(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), touch_interval=0.2)
+    store.set_face_emotion('s', 'happy')
+    first = store.get('s').updated_at
+
+    # Unchanged label within the interval: no write
+    store.set_face_emotion('s', 'happy')
+    assert store.get('s').updated_at == first
+
+    # Changed label: written right away
+    store.set_face_emotion('s', 'sad')
+    changed = store.get('s').updated_at
+    assert store.get('s').face_emotion == 'sad' and changed > first
+
+    # Unchanged label after the interval: updated_at refreshed
+    time.sleep(0.25)
+    store.set_face_emotion('s', 'sad')
+    assert store.get('s').updated_at > changed
+    store.close()
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    writer, reader = SQLiteSessionStore(path), SQLiteSessionStore(path)
+
+    writer.update('s', lambda state: append_message(state, {'user_message': 'hi'}, 10))
+    writer.set_face_emotion('s', 'happy')
+
+    state = reader.get('s', include_conversation=True)
+    assert state.face_emotion == 'happy'
+    assert state.conversation == [{'user_message': 'hi'}]
+    writer.close()
+    reader.close()
@@ -0,0 +1,48 @@
+"""
+Parity of the quantized and ONNX text backends with the fp32 torch model.
+Needs torch and transformers plus the EmoRoBERTa weights (downloaded on
+first run); skipped when they are unavailable.
+"""
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+
+from emotion_detector import EmotionDetector
+
+PARITY_TEXTS = [
+    "I'm so happy today!",
+    "This is really frustrating.",
+    "I feel sad and lonely.",
+    "What a wonderful surprise!",
+    "I'm scared about the results of my test tomorrow.",
+    "Thank you so much for listening to me.",
+    "I don't know what to do anymore, everything feels pointless.",
+    "That joke was hilarious, I can't stop laughing."
+]
+
+def load_detector(**options):
+    """Load only the text model on the given backend, skipping if it is unavailable"""
+    detector = EmotionDetector(load_models=False, text_cache_size=0, **options)
+    try:
+        detector.load_text_emotion_model()
+    except RuntimeError as e:
+        pytest.skip(f"Text emotion model unavailable: {e}")
+    return detector
+
+@pytest.mark.parametrize('backend, tolerance', [
+    ('torch_int8', 0.1),
+    ('onnx', 1e-3)
+])
+def test_text_backend_matches_fp32(backend, tolerance, tmp_path):
+    if backend == 'onnx':
+        pytest.importorskip('onnxruntime')
+
+    detector = load_detector(text_backend=backend, onnx_model_path=str(tmp_path / 'emoroberta.onnx'))
+    assert detector.text_backend == backend
+
+    parity = detector.verify_text_backend_parity(PARITY_TEXTS)
+
+    assert parity['mismatches'] == []
+    assert parity['max_abs_diff'] <= tolerance
@@ -6,7 +6,7 @@ Handles real-time communication between frontend and backend.
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 
 class WebSocketHandler:
     """
@@ -22,8 +22,19 @@ class WebSocketHandler:
         """
         self.socketio = socketio
         self.active_sessions = {}
+        self.frame_handler = None
         self.setup_handlers()
     
+    def set_frame_handler(self, frame_handler: Optional[Callable[[bytes, str, Optional[str]], Dict[str, Any]]]):
+        """
+        Set the function used to process binary frames.
+        
+        Args:
+            frame_handler: Function taking raw JPEG bytes, a session ID and the requested
+                denoise method (or None) and returning an emotion result
+        """
+        self.frame_handler = frame_handler
+    
     def setup_handlers(self):
         """Setup WebSocket event handlers"""
         
@@ -83,6 +94,38 @@ class WebSocketHandler:
                 session_id = self.active_sessions[request.sid]['session_id']
                 emit('video_status_update', data, room=session_id)
         
+        @self.socketio.on('frame')
+        def handle_frame(data):
+            """Handle a binary JPEG frame sent as a Socket.IO attachment"""
+            if self.frame_handler is None:
+                emit('frame_result', {'error': 'Frame processing not available'})
+                return
+            
+            # Either the raw bytes or {'frame': bytes, 'denoise': method}
+            frame_bytes = data.get('frame') if isinstance(data, dict) else data
+            denoise = data.get('denoise') if isinstance(data, dict) else None
+            if not isinstance(frame_bytes, (bytes, bytearray, memoryview)):
+                emit('frame_result', {'error': 'Expected binary JPEG data'})
+                return
+            
+            # Clients that joined a session share its state; others use their socket ID
+            if request.sid in self.active_sessions:
+                session_id = self.active_sessions[request.sid]['session_id']
+            else:
+                session_id = request.sid
+            
+            try:
+                result = self.frame_handler(frame_bytes, session_id, denoise)
+            except Exception as e:
+                print(f"Error processing frame: {e}")
+                result = {'error': 'Frame processing failed'}
+            
+            if 'face_emotion' in result and request.sid in self.active_sessions:
+                self.active_sessions[request.sid]['emotions']['face'] = result['face_emotion']
+            
+            # Reply to the sender only
+            emit('frame_result', result)
+        
         @self.socketio.on('mic_status')
         def handle_mic_status(data):
             """Handle microphone on/off status"""
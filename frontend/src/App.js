@@ -68,6 +68,8 @@ function App() {
   
   // Refs
   const webcamRef = useRef(null);
+  const socketRef = useRef(null);
+  const sessionIdRef = useRef(`session-${Date.now()}-${Math.random().toString(36).slice(2, 10)}`);
   const processingIntervalRef = useRef(null);
   
   // Speech recognition
@@ -84,16 +86,54 @@ function App() {
   useEffect(() => {
     const newSocket = io('http://localhost:5000');
     setSocket(newSocket);
+    socketRef.current = newSocket;
     
     newSocket.on('connect', () => {
       console.log('Connected to backend');
+      newSocket.emit('join_session', { session_id: sessionIdRef.current });
     });
     
     newSocket.on('emotion_update', (data) => {
       setCurrentEmotion(data.emotion);
     });
     
-    return () => newSocket.close();
+    // Result of a binary frame sent with the 'frame' event
+    newSocket.on('frame_result', (data) => {
+      if (data.face_emotion) {
+        setCurrentEmotion(data.face_emotion);
+        newSocket.emit('emotion_update', {
+          emotion: data.face_emotion,
+          confidence: data.confidence
+        });
+      } else if (data.error) {
+        console.error('Error processing frame:', data.error);
+      }
+      setIsProcessing(false);
+    });
+    
+    // Streamed AI response chunks for messages sent with stream: true
+    newSocket.on('ai_response', (data) => {
+      if (data.message_id === undefined || data.message_id === null) return;
+      setMessages(prev => {
+        if (!prev.some(message => message.id === data.message_id)) {
+          return [...prev, {
+            id: data.message_id,
+            type: 'ai',
+            text: data.done ? data.ai_response : data.chunk,
+            timestamp: new Date()
+          }];
+        }
+        return prev.map(message => message.id === data.message_id
+          ? { ...message, text: data.done ? data.ai_response : message.text + data.chunk }
+          : message
+        );
+      });
+    });
+    
+    return () => {
+      socketRef.current = null;
+      newSocket.close();
+    };
   }, []);
 
   // Start emotion processing when video is on
@@ -129,6 +169,23 @@ function App() {
   const captureAndProcessFrame = async () => {
     if (!webcamRef.current) return;
     
+    // Prefer sending raw JPEG bytes over the socket
+    const activeSocket = socketRef.current;
+    if (activeSocket && activeSocket.connected) {
+      const canvas = webcamRef.current.getCanvas();
+      if (!canvas) return;
+      
+      setIsProcessing(true);
+      canvas.toBlob(async (blob) => {
+        if (!blob) {
+          setIsProcessing(false);
+          return;
+        }
+        activeSocket.emit('frame', await blob.arrayBuffer());
+      }, 'image/jpeg', 0.92);
+      return;
+    }
+    
     try {
       const imageSrc = webcamRef.current.getScreenshot();
       if (!imageSrc) return;
@@ -136,7 +193,8 @@ function App() {
       setIsProcessing(true);
       
       const response = await axios.post('/api/process_frame', {
-        frame: imageSrc
+        frame: imageSrc,
+        session_id: sessionIdRef.current
       });
       
       if (response.data.face_emotion) {
@@ -163,28 +221,43 @@ function App() {
     try {
       setIsProcessing(true);
       
-      const response = await axios.post('/api/process_text', {
-        text: text
-      });
-      
-      // Add user message
-      const userMessage = {
-        id: Date.now(),
+      // Show the user message right away; the AI reply streams in over the socket
+      const userMessageId = Date.now();
+      const aiMessageId = userMessageId + 1;
+      setMessages(prev => [...prev, {
+        id: userMessageId,
         type: 'user',
         text: text,
-        emotion: response.data.text_emotion,
         timestamp: new Date()
-      };
+      }]);
       
-      // Add AI response
-      const aiMessage = {
-        id: Date.now() + 1,
-        type: 'ai',
-        text: response.data.ai_response,
-        timestamp: new Date()
-      };
+      const streaming = Boolean(socketRef.current && socketRef.current.connected);
+      const response = await axios.post('/api/process_text', {
+        text: text,
+        session_id: sessionIdRef.current,
+        stream: streaming,
+        message_id: aiMessageId
+      });
       
-      setMessages(prev => [...prev, userMessage, aiMessage]);
+      // Add the detected emotion and the complete AI response
+      setMessages(prev => {
+        const updated = prev.map(message => message.id === userMessageId
+          ? { ...message, emotion: response.data.text_emotion }
+          : message
+        );
+        if (updated.some(message => message.id === aiMessageId)) {
+          return updated.map(message => message.id === aiMessageId
+            ? { ...message, text: response.data.ai_response }
+            : message
+          );
+        }
+        return [...updated, {
+          id: aiMessageId,
+          type: 'ai',
+          text: response.data.ai_response,
+          timestamp: new Date()
+        }];
+      });
       
     } catch (error) {
       console.error('Error processing text:', error);